@@ -0,0 +1,58 @@
+import itertools
+import time
+import numpy as np
+import util
+
+
+def sample_inputs():
+    """Grid of inputs covering every category plus unknown and missing values"""
+    brands = util.get_category_options('Brand') + ['Unknown Brand']
+    materials = util.get_category_options('Material') + [None]
+    styles = util.get_category_options('Style')
+    colors = util.get_category_options('Color')
+    sizes = ['Small', 'Medium', 'Large', 'Huge']
+
+    for brand, material, style, color, size in itertools.product(brands, materials, styles, colors, sizes):
+        yield {
+            'Brand': brand,
+            'Material': material,
+            'Size': size,
+            'Compartments': 3,
+            'Laptop Compartment': 'Yes',
+            'Waterproof': 'No',
+            'Style': style,
+            'Color': color,
+            'Weight Capacity (kg)': 12.5
+        }
+
+
+def check_parity():
+    """Compare the fast path against the DataFrame path on every sample input"""
+    checked = 0
+    for input_data in sample_inputs():
+        fast = util.predict_price(input_data)
+        reference = util.predict_price_frame(input_data)
+        if not np.isclose(fast, reference, rtol=0, atol=1e-6):
+            raise AssertionError(f"Parity mismatch for {input_data}: {fast} != {reference}")
+        checked += 1
+    print(f"Parity OK on {checked} inputs")
+
+
+def time_calls(fn, input_data, n_calls):
+    fn(input_data)  # warm up
+    timings = np.empty(n_calls)
+    for i in range(n_calls):
+        start = time.perf_counter()
+        fn(input_data)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+if __name__ == '__main__':
+    util.load_saved_artifacts()
+    check_parity()
+
+    test_input = next(sample_inputs())
+    for name, fn in [('DataFrame path', util.predict_price_frame), ('Fast path', util.predict_price)]:
+        timings = time_calls(fn, test_input, 2000)
+        print(f"{name:>15}: p50 {np.percentile(timings, 50):8.1f} us   p99 {np.percentile(timings, 99):8.1f} us")
@@ -1,70 +1,205 @@
-from flask import Flask, request, jsonify
-import util
-
-app = Flask(__name__)
-
-
-@app.route('/api/get_category_options', methods=['GET'])
-def get_category_options():
-    try:
-        category = request.args.get('category')
-        if not category:
-            return jsonify({'error': 'Category parameter is required'}), 400
-
-        options = util.get_category_options(category)
-        response = jsonify({
-            'options': options,
-            'status': 'success'
-        })
-        response.headers.add('Access-Control-Allow-Origin', '*')
-        return response
-    except Exception as e:
-        return jsonify({'error': str(e), 'status': 'error'}), 500
-
-
-@app.route('/api/predict_price', methods=['POST'])
-def predict_price():
-    try:
-        if not request.is_json:
-            return jsonify({'error': 'Request must be JSON'}), 400
-
-        data = request.get_json()
-        required_fields = [
-            'brand', 'material', 'size', 'compartments',
-            'laptop_compartment', 'waterproof', 'style',
-            'color', 'weight_capacity'
-        ]
-
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing field: {field}'}), 400
-
-        input_data = {
-            'Brand': data['brand'],
-            'Material': data['material'],
-            'Size': data['size'],
-            'Compartments': int(data['compartments']),
-            'Laptop Compartment': data['laptop_compartment'],
-            'Waterproof': data['waterproof'],
-            'Style': data['style'],
-            'Color': data['color'],
-            'Weight Capacity (kg)': float(data['weight_capacity'])
-        }
-
-        prediction = util.predict_price(input_data)
-
-        return jsonify({
-            'estimated_price': prediction,
-            'status': 'success'
-        })
-    except Exception as e:
-        return jsonify({
-            'error': str(e),
-            'status': 'error'
-        }), 500
-
-
-if __name__ == "__main__":
-    print("Starting Python Flask Server for Backpack Price Prediction...")
-    util.load_saved_artifacts()
+import os
+import sys
+import json
+from flask import Flask, request, jsonify
+import util
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.batching import MicroBatcher
+
+app = Flask(__name__)
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('BACKPACK_MAX_BATCH_SIZE', 10000))
+
+# Opt-in request coalescing: concurrent /api/predict_price calls share one model call
+batcher = None
+if os.environ.get('BACKPACK_MICRO_BATCHING') == '1':
+    batcher = MicroBatcher(
+        util.predict_prices,
+        max_batch_size=int(os.environ.get('BACKPACK_MICRO_BATCH_SIZE', 64)),
+        max_wait_ms=float(os.environ.get('BACKPACK_MICRO_BATCH_WAIT_MS', 5))
+    )
+
+REQUIRED_FIELDS = [
+    'brand', 'material', 'size', 'compartments',
+    'laptop_compartment', 'waterproof', 'style',
+    'color', 'weight_capacity'
+]
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+def parse_input(data):
+    """Map an API payload onto the model's input columns, raising ValueError on bad input"""
+    if not isinstance(data, dict):
+        raise ValueError('Record must be an object')
+
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            raise ValueError(f'Missing field: {field}')
+
+    return {
+        'Brand': data['brand'],
+        'Material': data['material'],
+        'Size': data['size'],
+        'Compartments': int(data['compartments']),
+        'Laptop Compartment': data['laptop_compartment'],
+        'Waterproof': data['waterproof'],
+        'Style': data['style'],
+        'Color': data['color'],
+        'Weight Capacity (kg)': float(data['weight_capacity'])
+    }
+
+
+def read_batch_payload():
+    """Read a JSON array or NDJSON request body into a list of records.
+
+    Lines of an NDJSON body that are not valid JSON are kept as error markers so
+    they can be reported per row instead of rejecting the whole upload.
+    """
+    if request.mimetype in NDJSON_MIMETYPES:
+        records = []
+        for line_no, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                records.append(ValueError(f'Invalid JSON on line {line_no}'))
+        return records
+
+    if not request.is_json:
+        raise ValueError('Request must be a JSON array or NDJSON')
+
+    data = request.get_json(silent=True)
+    if data is None:
+        raise ValueError('Request body must be valid JSON')
+    if isinstance(data, dict):
+        data = data.get('records')
+    if not isinstance(data, list):
+        raise ValueError('Request body must be a JSON array of records')
+    return data
+
+
+@app.route('/api/get_category_options', methods=['GET'])
+def get_category_options():
+    try:
+        category = request.args.get('category')
+        if not category:
+            return jsonify({'error': 'Category parameter is required'}), 400
+
+        options = util.get_category_options(category)
+        response = jsonify({
+            'options': options,
+            'status': 'success'
+        })
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 500
+
+
+@app.route('/api/predict_price', methods=['POST'])
+def predict_price():
+    try:
+        if not request.is_json:
+            return jsonify({'error': 'Request must be JSON'}), 400
+
+        try:
+            input_data = parse_input(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if batcher is not None:
+            result = batcher.submit(input_data)
+            if 'error' in result:
+                return jsonify({'error': result['error'], 'status': 'error'}), 400
+            prediction = result['estimated_price']
+        else:
+            prediction = util.predict_price(input_data)
+
+        return jsonify({
+            'estimated_price': prediction,
+            'status': 'success'
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+
+@app.route('/api/predict_price_batch', methods=['POST'])
+def predict_price_batch():
+    try:
+        try:
+            payload = read_batch_payload()
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'error'}), 400
+
+        max_batch_size = app.config['MAX_BATCH_SIZE']
+        if len(payload) > max_batch_size:
+            return jsonify({
+                'error': f'Batch of {len(payload)} records exceeds the maximum of {max_batch_size}',
+                'status': 'error'
+            }), 413
+
+        results = [None] * len(payload)
+        records, positions = [], []
+        for i, data in enumerate(payload):
+            try:
+                if isinstance(data, Exception):
+                    raise data
+                records.append(parse_input(data))
+                positions.append(i)
+            except (ValueError, TypeError) as e:
+                results[i] = {'error': str(e)}
+
+        for i, result in zip(positions, util.predict_prices(records)):
+            results[i] = result
+
+        predictions = [dict(result, index=i) for i, result in enumerate(results)]
+        return jsonify({
+            'predictions': predictions,
+            'count': len(predictions),
+            'errors': sum('error' in p for p in predictions),
+            'status': 'success'
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 500
+
+
+@app.route('/api/artifacts', methods=['GET'])
+def artifacts():
+    try:
+        return jsonify({'artifacts': util.get_artifact_stats(), 'status': 'success'})
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 500
+
+
+@app.route('/api/reload_artifacts', methods=['POST'])
+def reload_artifacts():
+    try:
+        version = (request.get_json(silent=True) or {}).get('version')
+        if util.reload_artifacts_async(version) is None:
+            return jsonify({'status': 'already current', 'version': util.get_artifact_stats()['active_version']})
+        return jsonify({'status': 'loading', 'version': version or 'latest'}), 202
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'error'}), 500
+
+
+@app.route('/api/batching_stats', methods=['GET'])
+def batching_stats():
+    if batcher is None:
+        return jsonify({'enabled': False, 'status': 'success'})
+    return jsonify({'enabled': True, 'stats': batcher.stats(), 'status': 'success'})
+
+
+if __name__ == "__main__":
+    print("Starting Python Flask Server for Backpack Price Prediction...")
+    util.load_saved_artifacts()
+    if batcher is not None:
+        batcher.start()
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
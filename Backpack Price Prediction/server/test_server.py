@@ -0,0 +1,53 @@
+import os
+import pytest
+import util
+from server import app
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+
+RECORD = {
+    'brand': 'Nike',
+    'material': 'Polyester',
+    'size': 'Medium',
+    'compartments': 3,
+    'laptop_compartment': 'Yes',
+    'waterproof': 'No',
+    'style': 'Backpack',
+    'color': 'Black',
+    'weight_capacity': 12.5
+}
+
+
+@pytest.fixture(scope='module')
+def client():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('BACKPACK_ARTIFACTS_DIR', ARTIFACTS_DIR)
+        util.load_saved_artifacts()
+        yield app.test_client()
+
+
+@pytest.mark.parametrize('body', ['[1,', '{"records": ', 'not json'])
+def test_batch_rejects_malformed_json(client, body):
+    response = client.post('/api/predict_price_batch', data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Request body must be valid JSON', 'status': 'error'}
+
+
+def test_batch_reports_non_string_category_per_row(client):
+    payload = [RECORD, dict(RECORD, brand=['x']), dict(RECORD, size={'cm': 40}), RECORD]
+    response = client.post('/api/predict_price_batch', json=payload)
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body['count'] == 4
+    assert body['errors'] == 2
+    predictions = body['predictions']
+    assert predictions[1] == {'error': "Invalid value for Brand: ['x']", 'index': 1}
+    assert predictions[2] == {'error': "Invalid value for Size: {'cm': 40}", 'index': 2}
+    assert predictions[0]['estimated_price'] == pytest.approx(predictions[3]['estimated_price'])
+
+
+def test_reload_without_version_is_a_no_op_when_current(client):
+    response = client.post('/api/reload_artifacts', json={})
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'already current', 'version': '0'}
@@ -0,0 +1,91 @@
+import itertools
+import os
+import numpy as np
+import pytest
+import util
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+
+BASE_INPUT = {
+    'Brand': 'Nike',
+    'Material': 'Polyester',
+    'Size': 'Medium',
+    'Compartments': 3,
+    'Laptop Compartment': 'Yes',
+    'Waterproof': 'No',
+    'Style': 'Backpack',
+    'Color': 'Black',
+    'Weight Capacity (kg)': 12.5
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def artifacts():
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('BACKPACK_ARTIFACTS_DIR', ARTIFACTS_DIR)
+        util.load_saved_artifacts()
+        yield
+
+
+def sample_inputs():
+    """Known, unknown and missing values for every categorical and mapped field"""
+    brands = util.get_category_options('Brand') + ['Unknown Brand', None]
+    materials = util.get_category_options('Material') + [None]
+    sizes = ['Small', 'Medium', 'Large', 'Huge', None]
+    flags = ['Yes', 'No', 'Maybe', None]
+    for brand, material, size, flag in itertools.product(brands, materials, sizes, flags):
+        yield dict(BASE_INPUT, Brand=brand, Material=material, Size=size,
+                   **{'Laptop Compartment': flag, 'Waterproof': flag})
+    for style, color in itertools.product(util.get_category_options('Style') + ['Duffel', None],
+                                          util.get_category_options('Color') + ['Purple', None]):
+        yield dict(BASE_INPUT, Style=style, Color=color)
+    for compartments, weight in [(0, 5.0), (10, 30.0), (float('nan'), 12.5),
+                                  (-1, 12.5), (-1, 0.0)]:
+        yield dict(BASE_INPUT, **{'Compartments': compartments, 'Weight Capacity (kg)': weight})
+
+
+def test_fast_path_matches_dataframe_path():
+    for input_data in sample_inputs():
+        fast = util.predict_price(input_data)
+        reference = util.predict_price_frame(input_data)
+        assert np.isclose(fast, reference, rtol=0, atol=1e-6, equal_nan=True), input_data
+
+
+def test_unknown_category_uses_encoded_unknown_value():
+    unknown = dict(BASE_INPUT, Brand='Unknown Brand')
+    assert util.predict_price(unknown) == pytest.approx(util.predict_price_frame(unknown), abs=1e-6)
+    assert util.predict_price(dict(unknown, Brand=None)) == pytest.approx(util.predict_price(unknown), abs=1e-6)
+
+
+def test_batch_matches_single_rows():
+    records = list(sample_inputs())
+    results = util.predict_prices(records)
+    assert len(results) == len(records)
+    for input_data, result in zip(records, results):
+        assert np.isclose(result['estimated_price'], util.predict_price(input_data),
+                          rtol=0, atol=1e-6, equal_nan=True), input_data
+
+
+@pytest.mark.parametrize('col', ['Compartments', 'Weight Capacity (kg)'])
+def test_missing_numeric_is_rejected_by_both_paths(col):
+    missing = dict(BASE_INPUT, **{col: None})
+    with pytest.raises(ValueError) as single_error:
+        util.predict_price(missing)
+
+    results = util.predict_prices([BASE_INPUT, missing, {'Brand': 'Nike'}, 'not a record'])
+    assert results[0]['estimated_price'] == pytest.approx(util.predict_price(BASE_INPUT), abs=1e-6)
+    assert results[1] == {'error': str(single_error.value)}
+    assert results[2] == {'error': 'Missing field: Material'}
+    assert results[3] == {'error': 'Record must be an object'}
+
+
+@pytest.mark.parametrize('col, value', [('Brand', ['x']), ('Size', {'cm': 40}), ('Waterproof', 1)])
+def test_non_string_category_is_rejected_per_row(col, value):
+    invalid = dict(BASE_INPUT, **{col: value})
+    with pytest.raises(ValueError) as single_error:
+        util.predict_price(invalid)
+
+    results = util.predict_prices([BASE_INPUT, invalid, BASE_INPUT])
+    assert results[1] == {'error': str(single_error.value)}
+    for result in results[0], results[2]:
+        assert result['estimated_price'] == pytest.approx(util.predict_price(BASE_INPUT), abs=1e-6)
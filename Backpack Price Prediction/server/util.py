@@ -1,104 +1,303 @@
-import pickle
-import json
-import pandas as pd
-from pathlib import Path
-
-# Global variables to hold artifacts
-__model = None
-__encoder = None
-__features = None
-__size_map = {'Small': 0, 'Medium': 1, 'Large': 2}
-__category_columns = ['Brand', 'Material', 'Style', 'Color']
-
-
-def load_saved_artifacts():
-    print("Loading saved artifacts...")
-    global __model, __encoder, __features
-
-    try:
-        artifacts_path = Path("model_artifacts")
-
-        # Load model
-        with open(artifacts_path / "lgbm_model.pkl", 'rb') as f:
-            __model = pickle.load(f)
-
-        # Load encoder
-        with open(artifacts_path / "ordinal_encoder.pkl", 'rb') as f:
-            __encoder = pickle.load(f)
-
-        # Load features
-        with open(artifacts_path / "features.json", 'r') as f:
-            __features = json.load(f)
-
-        print("Artifacts loaded successfully")
-    except Exception as e:
-        print(f"Error loading artifacts: {str(e)}")
-        raise
-
-
-def get_category_options(category):
-    if not __encoder or not __category_columns:
-        raise Exception("Artifacts not loaded")
-
-    if category not in __category_columns:
-        return []
-
-    try:
-        cat_index = __category_columns.index(category)
-        return [str(x) for x in __encoder.categories_[cat_index] if str(x) != 'nan']
-    except Exception as e:
-        print(f"Error getting category options: {str(e)}")
-        return []
-
-
-def predict_price(input_data):
-    """Process input and return prediction using the same logic as training"""
-    try:
-        if not __model or not __encoder or not __features:
-            raise Exception("Model artifacts not loaded")
-
-        # Convert to DataFrame
-        df = pd.DataFrame([input_data])
-
-        # Feature engineering (matches training pipeline)
-        df['Size'] = df['Size'].map(__size_map).fillna(-1)
-        df['Weight_per_compartment'] = df['Weight Capacity (kg)'] / (df['Compartments'] + 1)
-        df['Laptop Compartment'] = df['Laptop Compartment'].map({'Yes': 1, 'No': 0}).fillna(0)
-        df['Waterproof'] = df['Waterproof'].map({'Yes': 1, 'No': 0}).fillna(0)
-
-        # Encode categoricals
-        categorical_cols = [col for col in __category_columns if col in df.columns]
-        df[categorical_cols] = __encoder.transform(df[categorical_cols])
-
-        # Ensure correct features and dtypes
-        df = df[__features].astype('float32')
-        for f in __features:
-            if f not in df.columns:
-                df[f] = 0  # Default for missing features
-
-        return float(__model.predict(df)[0])
-
-    except Exception as e:
-        print(f"Prediction error: {str(e)}")
-        raise
-
-
-if __name__ == '__main__':
-    load_saved_artifacts()
-    print("Brand options:", get_category_options('Brand'))
-    print("Material options:", get_category_options('Material'))
-    print("Style options:", get_category_options('Style'))
-    print("Color options:", get_category_options('Color'))
-
-    test_input = {
-        'Brand': 'Nike',
-        'Material': 'Polyester',
-        'Size': 'Medium',
-        'Compartments': 3,
-        'Laptop Compartment': 'Yes',
-        'Waterproof': 'No',
-        'Style': 'Backpack',
-        'Color': 'Black',
-        'Weight Capacity (kg)': 12.5
-    }
-    print("Test prediction:", predict_price(test_input))
\ No newline at end of file
+import os
+import sys
+import math
+import threading
+import numpy as np
+import pandas as pd
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.artifact_registry import ArtifactRegistry, load_file
+
+# Global variables to hold artifacts
+__registry = None
+__artifact_names = {'model': 'lgbm_model', 'encoder': 'ordinal_encoder', 'features': 'features'}
+__size_map = {'Small': 0, 'Medium': 1, 'Large': 2}
+__binary_map = {'Yes': 1, 'No': 0}
+__category_columns = ['Brand', 'Material', 'Style', 'Color']
+__numeric_columns = ['Compartments', 'Weight Capacity (kg)']
+__input_columns = ['Brand', 'Material', 'Size', 'Compartments', 'Laptop Compartment',
+                   'Waterproof', 'Style', 'Color', 'Weight Capacity (kg)']
+__text_columns = [col for col in __input_columns if col not in __numeric_columns]
+__row_buffers = threading.local()
+
+
+def _artifacts_dir():
+    if 'BACKPACK_ARTIFACTS_DIR' in os.environ:
+        return os.environ['BACKPACK_ARTIFACTS_DIR']
+    # Deployments use model_artifacts/; the repository ships them in artifacts/
+    return 'model_artifacts' if os.path.isdir('model_artifacts') else 'artifacts'
+
+
+def load_saved_artifacts(version=None):
+    print("Loading saved artifacts...")
+    global __registry
+
+    try:
+        if __registry is None:
+            __registry = ArtifactRegistry(_artifacts_dir(), __artifact_names.values(), _load_bundle)
+        __registry.load(version)
+
+        watch_seconds = float(os.environ.get('BACKPACK_ARTIFACT_WATCH_SECONDS', 0))
+        if watch_seconds > 0:
+            __registry.watch(watch_seconds)
+
+        print("Artifacts loaded successfully")
+    except Exception as e:
+        print(f"Error loading artifacts: {str(e)}")
+        raise
+
+
+def reload_artifacts_async(version=None):
+    """Load a new artifact version in the background and swap it in when ready; None if already current"""
+    if __registry is None:
+        raise Exception("Artifacts not loaded")
+    return __registry.reload_async(version)
+
+
+def get_artifact_stats():
+    if __registry is None:
+        raise Exception("Artifacts not loaded")
+    return __registry.stats()
+
+
+def _artifacts():
+    if __registry is None:
+        raise Exception("Model artifacts not loaded")
+    return __registry.get()
+
+
+def _load_bundle(paths):
+    """Load one artifact version and precompile it for pandas-free scoring"""
+    model = load_file(paths[__artifact_names['model']])
+    encoder = load_file(paths[__artifact_names['encoder']])
+    features = load_file(paths[__artifact_names['features']])
+
+    # One {category: code} dict per encoded column, mirroring OrdinalEncoder.transform
+    category_lookup = {}
+    for col, categories in zip(encoder.feature_names_in_, encoder.categories_):
+        category_lookup[col] = {
+            value: float(code) for code, value in enumerate(categories)
+            if not (isinstance(value, float) and math.isnan(value))
+        }
+
+    if getattr(encoder, 'handle_unknown', 'error') == 'use_encoded_value':
+        unknown_code = float(encoder.unknown_value)
+    else:
+        unknown_code = None
+
+    return {
+        'model': model,
+        'encoder': encoder,
+        'features': features,
+        # The sklearn wrapper keeps the raw booster on booster_; a pickled Booster is used as is
+        'booster': getattr(model, 'booster_', model),
+        'category_lookup': category_lookup,
+        'unknown_code': unknown_code,
+        'missing_code': float(getattr(encoder, 'encoded_missing_value', np.nan)),
+        # Fixed (column index, feature name) order for filling the input row
+        'feature_slots': list(enumerate(features))
+    }
+
+
+def _encode_category(artifacts, col, value):
+    # OrdinalEncoder treats None as an unseen category; only a float NaN counts as missing
+    if isinstance(value, float) and math.isnan(value):
+        return artifacts['missing_code']
+
+    code = artifacts['category_lookup'][col].get(value)
+    if code is not None:
+        return code
+    if artifacts['unknown_code'] is None:
+        raise ValueError(f"Found unknown category {value!r} in column {col} during transform")
+    return artifacts['unknown_code']
+
+
+def _numeric_value(input_data, col):
+    # None cannot be scored; both paths reject it with the same message
+    value = input_data[col]
+    if value is None:
+        raise ValueError(f"Missing value for {col}")
+    return float(value)
+
+
+def _check_categories(input_data):
+    # Categories are strings (None is an unseen one); a list or object cannot be encoded
+    for col in __text_columns:
+        value = input_data[col]
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"Invalid value for {col}: {value!r}")
+
+
+def _row_buffer(n_features):
+    """Per-thread preallocated float32 input row, reused across calls"""
+    row = getattr(__row_buffers, 'row', None)
+    if row is None or row.shape[1] != n_features:
+        row = np.zeros((1, n_features), dtype=np.float32)
+        __row_buffers.row = row
+    return row
+
+
+def get_category_options(category):
+    encoder = _artifacts()['encoder']
+
+    if category not in __category_columns:
+        return []
+
+    try:
+        cat_index = __category_columns.index(category)
+        return [str(x) for x in encoder.categories_[cat_index] if str(x) != 'nan']
+    except Exception as e:
+        print(f"Error getting category options: {str(e)}")
+        return []
+
+
+def _engineer_features(artifacts, df):
+    """Apply the training feature pipeline column-wise to a DataFrame of raw inputs"""
+    # Feature engineering (matches training pipeline)
+    df['Size'] = df['Size'].map(__size_map).fillna(-1)
+    df['Weight_per_compartment'] = df['Weight Capacity (kg)'] / (df['Compartments'] + 1)
+    df['Laptop Compartment'] = df['Laptop Compartment'].map(__binary_map).fillna(0)
+    df['Waterproof'] = df['Waterproof'].map(__binary_map).fillna(0)
+
+    # Encode categoricals
+    categorical_cols = [col for col in __category_columns if col in df.columns]
+    df[categorical_cols] = artifacts['encoder'].transform(df[categorical_cols])
+
+    # Ensure correct features and dtypes
+    features = artifacts['features']
+    df = df[features].astype('float32')
+    for f in features:
+        if f not in df.columns:
+            df[f] = 0  # Default for missing features
+
+    return df
+
+
+def predict_price_frame(input_data):
+    """Reference DataFrame implementation of predict_price, kept for parity checks"""
+    artifacts = _artifacts()
+    df = _engineer_features(artifacts, pd.DataFrame([input_data]))
+    return float(artifacts['model'].predict(df)[0])
+
+
+def predict_price(input_data):
+    """Process input and return prediction using the same logic as training"""
+    try:
+        artifacts = _artifacts()
+        _check_categories(input_data)
+        weight = _numeric_value(input_data, 'Weight Capacity (kg)')
+        compartments = _numeric_value(input_data, 'Compartments')
+        # numpy division, like the pandas column: Compartments == -1 gives inf or nan, not an error
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight_per_compartment = float(np.float64(weight) / (compartments + 1))
+
+        # Feature engineering (matches training pipeline and _engineer_features)
+        values = {
+            'Size': __size_map.get(input_data['Size'], -1),
+            'Compartments': compartments,
+            'Laptop Compartment': __binary_map.get(input_data['Laptop Compartment'], 0),
+            'Waterproof': __binary_map.get(input_data['Waterproof'], 0),
+            'Weight Capacity (kg)': weight,
+            'Weight_per_compartment': weight_per_compartment,
+        }
+        for col in artifacts['category_lookup']:
+            values[col] = _encode_category(artifacts, col, input_data[col])
+
+        row = _row_buffer(len(artifacts['features']))
+        for i, feature in artifacts['feature_slots']:
+            row[0, i] = values.get(feature, 0)  # Default for missing features
+
+        return float(artifacts['booster'].predict(row)[0])
+
+    except Exception as e:
+        print(f"Prediction error: {str(e)}")
+        raise
+
+
+def predict_prices(records):
+    """Score a batch of inputs with one model call.
+
+    Returns one entry per record, in order: ``{'estimated_price': float}`` for rows
+    that could be scored and ``{'error': str}`` for rows that could not, so a bad
+    row never fails the rest of the batch.
+    """
+    artifacts = _artifacts()
+
+    results = [None] * len(records)
+
+    # Flag rows that are not objects, miss required fields or carry non-string
+    # categories before any column work, so one bad row cannot fail the batch
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            results[i] = {'error': 'Record must be an object'}
+            continue
+        missing = [col for col in __input_columns if col not in record]
+        if missing:
+            results[i] = {'error': f"Missing field: {missing[0]}"}
+            continue
+        try:
+            _check_categories(record)
+        except ValueError as e:
+            results[i] = {'error': str(e)}
+
+    rows = [i for i, result in enumerate(results) if result is None]
+    if not rows:
+        return results
+
+    df = pd.DataFrame.from_records([records[i] for i in rows], columns=__input_columns)
+
+    # Numeric columns must be present and coerce cleanly; anything else is a per-row error
+    invalid = pd.Series(False, index=df.index)
+    for col in __numeric_columns:
+        missing = pd.Series([records[i][col] is None for i in rows], index=df.index)
+        for pos in df.index[missing & ~invalid]:
+            results[rows[pos]] = {'error': f"Missing value for {col}"}
+        invalid |= missing
+
+        values = pd.to_numeric(df[col], errors='coerce')
+        bad = values.isna() & df[col].notna()
+        for pos in df.index[bad & ~invalid]:
+            results[rows[pos]] = {'error': f"Invalid value for {col}: {df.at[pos, col]!r}"}
+        invalid |= bad
+        df[col] = values
+
+    if invalid.any():
+        rows = [row for row, skip in zip(rows, invalid) if not skip]
+        df = df[~invalid].reset_index(drop=True)
+    if not rows:
+        return results
+
+    try:
+        predictions = artifacts['model'].predict(_engineer_features(artifacts, df))
+    except Exception as e:
+        print(f"Batch prediction error: {str(e)}")
+        raise
+
+    for i, prediction in zip(rows, predictions):
+        results[i] = {'estimated_price': float(prediction)}
+
+    return results
+
+
+if __name__ == '__main__':
+    load_saved_artifacts()
+    print("Brand options:", get_category_options('Brand'))
+    print("Material options:", get_category_options('Material'))
+    print("Style options:", get_category_options('Style'))
+    print("Color options:", get_category_options('Color'))
+
+    test_input = {
+        'Brand': 'Nike',
+        'Material': 'Polyester',
+        'Size': 'Medium',
+        'Compartments': 3,
+        'Laptop Compartment': 'Yes',
+        'Waterproof': 'No',
+        'Style': 'Backpack',
+        'Color': 'Black',
+        'Weight Capacity (kg)': 12.5
+    }
+    print("Test prediction:", predict_price(test_input))
+    print("DataFrame path prediction:", predict_price_frame(test_input))
+    print("Test batch prediction:", predict_prices([test_input, dict(test_input, Size='Large'), {'Brand': 'Nike'}]))
\ No newline at end of file
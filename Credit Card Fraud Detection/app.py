@@ -3,9 +3,12 @@ import pandas as pd
 import numpy as np
 import joblib
 import plotly.express as px
-from utils.model_loader import load_model_artifacts
+from utils.model_loader import create_registry, load_model_artifacts
+from utils.scoring import score_values, score_csv
+from utils.feature_stats import feature_stats_path, load_feature_stats
 from utils.visualizations import (
     plot_feature_distributions,
+    plot_feature_histogram,
     plot_confusion_matrix,
     plot_metrics,
     generate_simulation_results
@@ -13,6 +16,7 @@ from utils.visualizations import (
 import warnings
 from datetime import datetime
 import os
+import tempfile
 
 # Suppress sklearn warnings
 warnings.filterwarnings('ignore', category=UserWarning)
@@ -74,12 +78,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-# Load model artifacts with caching and validation
-@st.cache_resource(ttl=3600)
+# One registry per server process; new model versions are swapped in without a restart
+@st.cache_resource
+def get_artifact_registry():
+    """Load the latest artifact version and watch the models directory for new ones"""
+    registry = create_registry()
+    registry.load()
+    registry.watch(float(os.environ.get('FRAUD_ARTIFACT_WATCH_SECONDS', 300)))
+    return registry
+
+
+# Statistics are computed offline by compute_feature_stats.py and stored next to each model version
+@st.cache_data
+def _cached_feature_stats(models_dir, version, mtime):
+    return load_feature_stats(models_dir, version)
+
+
+def get_feature_stats(version):
+    """Load the stored feature statistics and metrics for a model version (None if missing)"""
+    models_dir = str(get_artifact_registry().directory)
+    path = feature_stats_path(models_dir, version)
+    # A missing file is not cached, and the mtime picks up stats recomputed while the app runs
+    if not os.path.exists(path):
+        return None
+    return _cached_feature_stats(models_dir, version, os.path.getmtime(path))
+
+
+# Load model artifacts with validation
 def load_artifacts():
     """Load and validate model artifacts"""
     try:
-        model, scaler, features = load_model_artifacts()
+        model, scaler, features = load_model_artifacts(get_artifact_registry())
 
         # Validate loaded artifacts
         if not all([model, scaler, features]):
@@ -109,19 +138,12 @@ def predict_fraud(input_data):
         # Convert input to numpy array
         input_values = np.array([input_data[f] for f in features]).reshape(1, -1)
 
-        # Scale features
-        scaled_input = scaler.transform(input_values)
-
-        # Make prediction
-        prediction = model.predict(scaled_input)
-        decision_score = model.decision_function(scaled_input)
-
-        # Convert to probability using sigmoid
-        fraud_prob = 1 / (1 + np.exp(-decision_score))
+        # Scale and score with a single decision_function call
+        _, is_fraud, confidence = score_values(input_values, model, scaler)
 
         return {
-            'prediction': 'Fraud' if prediction[0] == -1 else 'Legitimate',
-            'confidence': float(fraud_prob[0] if prediction[0] == -1 else 1 - fraud_prob[0])
+            'prediction': 'Fraud' if is_fraud[0] else 'Legitimate',
+            'confidence': float(confidence[0])
         }
 
     except Exception as e:
@@ -154,7 +176,7 @@ SAMPLE_LEGIT = {
 
 # Navigation
 st.sidebar.title("Navigation")
-page = st.sidebar.radio("", ["Demo", "Model Analysis", "Business Impact", "About"], index=0)
+page = st.sidebar.radio("", ["Demo", "Batch Scoring", "Model Analysis", "Business Impact", "About"], index=0)
 
 # Demo Page
 if page == "Demo":
@@ -242,48 +264,113 @@ if page == "Demo":
             </div>
             """, unsafe_allow_html=True)
 
+# Batch Scoring Page
+elif page == "Batch Scoring":
+    st.title("Batch Scoring")
+    st.markdown("""
+    Upload a CSV of transactions (one column per model feature) to score them all at once.
+    The file is processed in chunks, so large daily extracts do not need to fit in memory.
+    For very large files, use the command line instead: `python batch_score.py transactions.csv scored.csv`
+    """)
+
+    uploaded = st.file_uploader("Transactions CSV", type="csv")
+    chunksize = st.number_input("Rows per chunk", min_value=1000, value=100_000, step=10_000)
+
+    if uploaded is not None and st.button("Score Transactions"):
+        progress_bar = st.progress(0.0)
+        status = st.empty()
+
+        def show_progress(rows, elapsed, fraction):
+            if fraction is not None:
+                progress_bar.progress(fraction)
+            status.text(f"{rows:,} rows scored ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+        output = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        output.close()
+        uploaded.seek(0)
+        try:
+            summary = score_csv(uploaded, output.name, model, scaler, features,
+                                chunksize=int(chunksize), progress=show_progress)
+        except Exception as e:
+            os.remove(output.name)
+            st.error(f"Batch scoring failed: {str(e)}")
+            st.stop()
+        progress_bar.progress(1.0)
+
+        cols = st.columns(3)
+        cols[0].metric("Transactions Scored", f"{summary['rows']:,}")
+        cols[1].metric("Flagged as Fraud", f"{summary['frauds']:,}")
+        cols[2].metric("Throughput", f"{summary['rows_per_second']:,.0f} rows/s")
+
+        with open(output.name, 'rb') as f:
+            st.download_button("Download Scored CSV", f.read(),
+                               file_name=f"scored_{datetime.now():%Y%m%d_%H%M}.csv", mime="text/csv")
+        os.remove(output.name)
+
 # Model Analysis Page
 elif page == "Model Analysis":
     st.title("Model Performance Analysis")
 
-    st.markdown("""
+    version = get_artifact_registry().active_version
+    stats = get_feature_stats(version)
+    if stats is None:
+        st.warning(f"""
+        No feature statistics found for model version {version}.
+        Run `python compute_feature_stats.py creditcard.csv` to compute them.
+        """)
+        st.stop()
+
+    st.markdown(f"""
     ## Isolation Forest Model Characteristics
 
-    Our fraud detection system uses an Isolation Forest algorithm with the following performance:
+    Evaluated on {stats['rows']:,} transactions from `{stats['source'] or 'uploaded data'}` 
+    (computed {stats['generated_at']}):
     """)
 
-    # Metrics display
-    metrics = {
-        'Recall': 0.87,
-        'Precision': 0.03,
-        'F1 Score': 0.06,
-        'ROC AUC': 0.91
-    }
+    metrics = stats['metrics']
+    if metrics is None:
+        st.info("The evaluation data has no Class labels, so only feature statistics are available.")
+    else:
+        # Metrics display
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(plot_metrics({
+                name: metrics[name] or 0.0 for name in ['Recall', 'Precision', 'F1 Score', 'ROC AUC']
+            }), use_container_width=True)
+        with col2:
+            roc_auc = f"{metrics['ROC AUC']:.2f}" if metrics['ROC AUC'] is not None else "n/a"
+            st.markdown(f"""
+            <div class="metric-box">
+                <h4>Key Metrics Explained</h4>
+                <ul>
+                    <li><strong>Recall ({metrics['Recall']:.0%})</strong>: Captures {metrics['Recall']:.0%} of actual fraud cases</li>
+                    <li><strong>Precision ({metrics['Precision']:.1%})</strong>: {metrics['Precision']:.1%} of flagged transactions are truly fraudulent</li>
+                    <li><strong>F1 Score ({metrics['F1 Score']:.2f})</strong>: Balance between precision and recall</li>
+                    <li><strong>ROC AUC ({roc_auc})</strong>: Chance a fraud case scores as more anomalous than a legitimate one</li>
+                    <li><strong>Fraud Rate ({metrics['Fraud Rate']:.2%})</strong>: Share of transactions labelled fraud; {metrics['Flagged Rate']:.1%} were flagged</li>
+                </ul>
+            </div>
+            """, unsafe_allow_html=True)
 
-    col1, col2 = st.columns(2)
-    with col1:
-        st.plotly_chart(plot_metrics(metrics), use_container_width=True)
-    with col2:
-        st.markdown("""
-        <div class="metric-box">
-            <h4>Key Metrics Explained</h4>
-            <ul>
-                <li><strong>Recall (87%)</strong>: Captures 87% of actual fraud cases</li>
-                <li><strong>Precision (3%)</strong>: Only 3% of flagged transactions are truly fraudulent</li>
-                <li><strong>F1 Score (0.06)</strong>: Balance between precision and recall</li>
-                <li><strong>ROC AUC (0.91)</strong>: Excellent discrimination between fraud and legitimate transactions</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-
-    # Confusion matrix
-    st.subheader("Confusion Matrix")
-    cm = np.array([[270000, 14315], [64, 428]])  # TN, FP, FN, TP
-    st.plotly_chart(plot_confusion_matrix(cm))
-
-    # Feature importance
+        # Confusion matrix
+        st.subheader("Confusion Matrix")
+        cm = np.array(stats['confusion_matrix'])  # TN, FP, FN, TP
+        st.plotly_chart(plot_confusion_matrix(cm))
+
+    # Feature distributions
     st.subheader("Feature Distributions")
-    st.plotly_chart(plot_feature_distributions())
+    st.plotly_chart(plot_feature_distributions(stats))
+
+    feature = st.selectbox("Feature", stats['features'])
+    st.plotly_chart(plot_feature_histogram(stats, feature), use_container_width=True)
+
+    with st.expander("Feature Quantiles"):
+        group = st.radio("Rows", list(stats['groups']), horizontal=True, format_func=str.title)
+        quantiles = pd.DataFrame(stats['groups'][group]['quantiles'], index=stats['features'])
+        quantiles.columns = [f"{float(q):.0%}" for q in quantiles.columns]
+        quantiles.insert(0, 'Mean', stats['groups'][group]['mean'])
+        quantiles.insert(1, 'Std Dev', stats['groups'][group]['std'])
+        st.dataframe(quantiles)
 
 # Business Impact Page
 # Business Impact Page
@@ -402,6 +489,19 @@ elif page == "About":
         - **Deployment**: Hugging Face Spaces
         """)
 
+    with st.expander("Model Artifacts", expanded=False):
+        artifact_stats = get_artifact_registry().stats()
+        st.markdown(f"**Active version**: {artifact_stats['active_version']}")
+        st.dataframe(pd.DataFrame([
+            {
+                'Version': version,
+                'Load time (s)': stats['load_seconds'],
+                'RSS change (MB)': stats['rss_delta_bytes'] / 2 ** 20,
+                'RSS after load (MB)': stats['rss_after_bytes'] / 2 ** 20
+            }
+            for version, stats in artifact_stats['versions'].items()
+        ]))
+
     st.markdown("""
     Developed for educational purposes using Python and Streamlit.
     For questions or support, please contact the development team.
@@ -409,9 +509,10 @@ elif page == "About":
 
 # Footer
 st.sidebar.markdown("---")
-st.sidebar.markdown("""
+st.sidebar.markdown(f"""
 **Fraud Detection System**  
 Version 1.0 
+Model version {get_artifact_registry().active_version} 
 Model by Anvarbek Kuziboev 
 [GitHub Repository](https://github.com/anvarbek11)  
 """)
\ No newline at end of file
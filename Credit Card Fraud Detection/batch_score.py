@@ -0,0 +1,43 @@
+import argparse
+import sys
+import warnings
+from utils.model_loader import load_model_artifacts
+from utils.parallel_scoring import ParallelScorer
+from utils.scoring import score_csv
+
+# Suppress sklearn warnings about fitted feature names, as the app does
+warnings.filterwarnings('ignore', category=UserWarning)
+
+
+def print_progress(rows, elapsed, fraction):
+    done = f"{fraction:6.1%}" if fraction is not None else "   ..."
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"\r{done}  {rows:,} rows scored  ({rate:,.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV of transactions with the fraud detection model")
+    parser.add_argument('input', help="CSV with one column per model feature")
+    parser.add_argument('output', help="Where to write the scored CSV")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows scored per vectorized call")
+    parser.add_argument('--keep-columns', nargs='*', help="Input columns to copy to the output (default: all)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Backfill mode: score row blocks of each chunk in this many processes (0 = all cores)")
+    parser.add_argument('--block-size', type=int, default=20_000, help="Rows per worker task in backfill mode")
+    args = parser.parse_args(argv)
+
+    model, scaler, features = load_model_artifacts()
+    with ParallelScorer(model, n_workers=args.workers or None, block_size=args.block_size) as scorer:
+        if scorer.n_workers > 1:
+            print(f"Backfill mode: {scorer.n_workers} worker processes, {args.block_size:,}-row blocks", file=sys.stderr)
+        summary = score_csv(args.input, args.output, model, scaler, features,
+                            chunksize=args.chunksize, keep_columns=args.keep_columns,
+                            progress=print_progress, decision_function=scorer.decision_function)
+
+    print(file=sys.stderr)
+    print(f"Scored {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_second']:,.0f} rows/s), {summary['frauds']:,} flagged as fraud")
+
+
+if __name__ == '__main__':
+    main()
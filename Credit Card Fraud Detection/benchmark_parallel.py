@@ -0,0 +1,46 @@
+import argparse
+import os
+import time
+import warnings
+import numpy as np
+from utils.model_loader import load_model_artifacts
+from utils.parallel_scoring import ParallelScorer
+from utils.scoring import model_features
+
+# Suppress sklearn warnings about fitted feature names, as the app does
+warnings.filterwarnings('ignore', category=UserWarning)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure backfill scoring throughput from 1 to N worker processes")
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--block-size', type=int, default=20_000)
+    parser.add_argument('--repeats', type=int, default=3, help="Best of this many runs per worker count")
+    args = parser.parse_args(argv)
+
+    model, scaler, features = load_model_artifacts()
+    rng = np.random.default_rng(0)
+    scaled = scaler.transform(rng.normal(size=(args.rows, len(model_features(features)))))
+    reference = model.decision_function(scaled[:args.block_size * 2])
+
+    counts = sorted({1, *(2 ** i for i in range(1, args.max_workers.bit_length())), args.max_workers})
+    baseline = None
+    print(f"{args.rows:,} rows, {args.block_size:,}-row blocks, {os.cpu_count()} CPUs available")
+    print(f"{'workers':>7}  {'seconds':>8}  {'rows/s':>10}  {'speedup':>7}")
+    for n_workers in counts:
+        with ParallelScorer(model, n_workers=n_workers, block_size=args.block_size) as scorer:
+            best = float('inf')
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                scores = scorer.decision_function(scaled)
+                best = min(best, time.perf_counter() - start)
+
+        if not np.allclose(scores[:len(reference)], reference):
+            raise SystemExit(f"Scores from {n_workers} workers differ from the single-process model")
+        baseline = baseline or best
+        print(f"{n_workers:>7}  {best:>8.2f}  {args.rows / best:>10,.0f}  {baseline / best:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
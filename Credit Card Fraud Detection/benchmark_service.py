@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+from utils.model_loader import create_registry
+from utils.scoring import model_features
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.artifact_registry import load_file
+
+
+async def client(host, port, body, deadline, latencies, errors):
+    """One keep-alive connection sending transactions back to back until the deadline"""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = (f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+
+            if b' 200 ' in status:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    features = model_features(latest_features(args.models_dir))
+    rng = np.random.default_rng(0)
+    body = json.dumps(dict(zip(features, rng.normal(size=len(features)).tolist()))).encode()
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(client(args.host, args.port, body, deadline, latencies, errors)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    timings = np.array(latencies) * 1000
+    print(f"Concurrency {args.concurrency}: {len(latencies):,} requests in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:,.0f} req/s), {len(errors)} errors")
+    if len(timings):
+        print(f"Latency p50 {np.percentile(timings, 50):.2f} ms   p99 {np.percentile(timings, 99):.2f} ms   "
+              f"max {timings.max():.2f} ms")
+
+
+def latest_features(models_dir):
+    """Feature list of the newest artifact version, without loading the model"""
+    versions = create_registry(models_dir).discover()
+    return load_file(list(versions.values())[-1]['features'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load generator for scoring_service.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--models-dir', default='models')
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,45 @@
+import argparse
+import sys
+import warnings
+from utils.model_loader import MODELS_DIR, create_registry
+from utils.parallel_scoring import ParallelScorer
+from utils.feature_stats import compute_feature_stats, feature_stats_path, save_feature_stats
+
+# Suppress sklearn warnings about fitted feature names, as the app does
+warnings.filterwarnings('ignore', category=UserWarning)
+
+
+def print_progress(rows, elapsed):
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"\r{rows:,} rows processed  ({rate:,.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the feature statistics and model metrics shown on the Model Analysis page")
+    parser.add_argument('input', help="Labelled transactions CSV (the training data or batch_score.py output)")
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    parser.add_argument('--version', help="Model version to evaluate (default: latest)")
+    parser.add_argument('--output', help="Where to write the stats (default: next to the model)")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1, help="Score chunks in this many processes (0 = all cores)")
+    args = parser.parse_args(argv)
+
+    registry = create_registry(args.models_dir)
+    version = registry.load(args.version)
+    model, scaler, features = registry.get()
+
+    with ParallelScorer(model, n_workers=args.workers or None) as scorer:
+        stats = compute_feature_stats(args.input, model, scaler, features, chunksize=args.chunksize,
+                                      progress=print_progress, decision_function=scorer.decision_function)
+    stats['version'] = version
+
+    output = args.output or feature_stats_path(args.models_dir, version)
+    save_feature_stats(stats, output)
+    print(file=sys.stderr)
+    print(f"Wrote statistics for {stats['rows']:,} rows in {stats['seconds']:.1f}s to {output}")
+    if stats['metrics'] is None:
+        print("No 'Class' column found, so model metrics were skipped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import warnings
+import numpy as np
+from utils.model_loader import create_registry
+from utils.scoring import model_features, score_values
+
+# Suppress sklearn warnings about fitted feature names, as the app does
+warnings.filterwarnings('ignore', category=UserWarning)
+
+MAX_BODY_BYTES = 10 * 2 ** 20
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class AsyncMicroBatcher:
+    """Coalesce concurrent transactions into one decision_function call.
+
+    The collector flushes when ``max_batch_size`` rows are queued or the oldest row
+    has waited ``max_wait_ms``. Scoring runs on a single worker thread so the event
+    loop keeps accepting requests while the trees are walked.
+    """
+
+    def __init__(self, registry, max_batch_size=256, max_wait_ms=2.0):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scorer')
+        self.stats = {'requests': 0, 'batches': 0, 'rows': 0, 'max_batch_size_seen': 0, 'predict_seconds': 0.0}
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def score(self, values):
+        """Score a (n, n_features) array; resolves once its batch has been scored"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((values, future))
+        self.stats['requests'] += 1
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 and self.queue.empty():
+                break
+            try:
+                item = self.queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(self.queue.get(), remaining)
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _score_batch(self, values):
+        model, scaler, _ = self.registry.get()
+        return score_values(values, model, scaler)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            values = np.concatenate([item[0] for item in batch])
+
+            start = time.perf_counter()
+            try:
+                scores, is_fraud, confidence = await loop.run_in_executor(self.executor, self._score_batch, values)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats['batches'] += 1
+            self.stats['rows'] += len(values)
+            self.stats['predict_seconds'] += time.perf_counter() - start
+            self.stats['max_batch_size_seen'] = max(self.stats['max_batch_size_seen'], len(values))
+
+            offset = 0
+            for item, future in batch:
+                n = len(item)
+                if not future.done():
+                    future.set_result([
+                        {
+                            'prediction': 'Fraud' if is_fraud[i] else 'Legitimate',
+                            'confidence': float(confidence[i]),
+                            'fraud_score': float(scores[i])
+                        }
+                        for i in range(offset, offset + n)
+                    ])
+                offset += n
+
+    def snapshot(self):
+        stats = dict(self.stats, queue_depth=self.queue.qsize(),
+                     max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait * 1000.0)
+        stats['mean_batch_size'] = stats['rows'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+
+class ScoringService:
+    def __init__(self, registry, batcher):
+        self.registry = registry
+        self.batcher = batcher
+
+    def to_values(self, transactions):
+        """Order each transaction's features as the model expects; raises ValueError on bad input"""
+        features = model_features(self.registry.get()[2])
+        values = np.empty((len(transactions), len(features)), dtype=np.float64)
+        for i, transaction in enumerate(transactions):
+            if not isinstance(transaction, dict):
+                raise ValueError(f"Transaction {i} must be an object")
+            try:
+                values[i] = [transaction[f] for f in features]
+            except KeyError as e:
+                raise ValueError(f"Transaction {i} is missing feature {e.args[0]}")
+            except (TypeError, ValueError):
+                raise ValueError(f"Transaction {i} has a non-numeric feature value")
+        return values
+
+    async def score(self, payload):
+        """Score one transaction object or a list of them"""
+        single = isinstance(payload, dict)
+        transactions = [payload] if single else payload
+        if not isinstance(transactions, list) or not transactions:
+            raise ValueError("Body must be a transaction object or a non-empty list of them")
+
+        results = await self.batcher.score(self.to_values(transactions))
+        return results[0] if single else results
+
+    # HTTP/1.1 front end (keep-alive, Content-Length bodies only)
+
+    async def handle_http(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, response = await self.route(method, path.split('?', 1)[0], body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok', 'model_version': self.registry.active_version}
+        if path == '/stats':
+            return 200, {'batching': self.batcher.snapshot(), 'artifacts': self.registry.stats()}
+        if path != '/score':
+            return 404, {'error': f'Unknown path {path}'}
+        if method != 'POST':
+            return 405, {'error': 'Use POST'}
+
+        try:
+            return 200, await self.score(json.loads(body or b'null'))
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    @staticmethod
+    async def respond(writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    # Local socket front end: one JSON transaction per line in, one JSON result per line out
+
+    async def handle_socket(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Like the HTTP path, a failed line gets an error reply and the connection stays open
+                try:
+                    result = await self.score(json.loads(line))
+                except Exception as e:
+                    result = {'error': str(e)}
+                writer.write(json.dumps(result).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    registry = create_registry(args.models_dir)
+    registry.load()
+    if args.watch_seconds > 0:
+        registry.watch(args.watch_seconds)
+
+    batcher = AsyncMicroBatcher(registry, args.max_batch_size, args.max_wait_ms)
+    batcher.start()
+    service = ScoringService(registry, batcher)
+
+    servers = [await asyncio.start_server(service.handle_http, args.host, args.port)]
+    print(f"Fraud scoring service (model {registry.active_version}) on http://{args.host}:{args.port}/score")
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        servers.append(await asyncio.start_unix_server(service.handle_socket, path=args.socket))
+        print(f"NDJSON scoring on unix socket {args.socket}")
+
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Low-latency HTTP/socket scoring service for the fraud model")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--socket', help="Also serve NDJSON on this unix socket path")
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    parser.add_argument('--watch-seconds', type=float, default=0, help="Poll for new model versions (0 disables)")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
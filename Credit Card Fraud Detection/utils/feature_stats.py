@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from utils.scoring import model_features, score_values
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.artifact_registry import UNVERSIONED
+
+LABEL_COLUMN = 'Class'
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+HISTOGRAM_BINS = 64
+HISTOGRAM_RANGE = (0.005, 0.995)
+SKETCH_BINS = 1024
+# IsolationForest decision_function values fall in [-1, 1]; fine bins keep the streamed ROC AUC close to exact
+SCORE_BINS = 4000
+SCORE_RANGE = (-1.0, 1.0)
+
+
+class FeatureAccumulator:
+    """Streaming per-feature moments, extrema, histograms and quantile sketches for one group of rows.
+
+    Moments are merged chunk by chunk (Chan et al.), so memory does not grow with the
+    number of rows. The display histogram has uniform bins between ``low`` and ``high``
+    plus an underflow and an overflow bucket. Quantiles come from a finer equi-depth
+    sketch whose ``sketch_edges`` (shape (bins + 1, n_features)) are fixed up front.
+    The exact min/max bound its two outer buckets.
+    """
+
+    def __init__(self, low, high, sketch_edges, bins=HISTOGRAM_BINS):
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.bins = bins
+        self.width = (self.high - self.low) / bins
+        self.sketch_edges = sketch_edges
+
+        n_features = len(self.low)
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+        self.histogram = np.zeros((n_features, bins + 2), dtype=np.int64)
+        self.sketch = np.zeros((n_features, len(sketch_edges) + 1), dtype=np.int64)
+
+    def update(self, values):
+        n = len(values)
+        if n == 0:
+            return
+
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        np.minimum(self.min, values.min(axis=0), out=self.min)
+        np.maximum(self.max, values.max(axis=0), out=self.max)
+
+        # Bucket 0 is underflow, 1..bins the regular bins, bins + 1 overflow; one bincount for all features
+        buckets = np.clip(np.floor((values - self.low) / self.width), -1, self.bins).astype(np.int64) + 1
+        buckets += np.arange(len(self.low)) * (self.bins + 2)
+        self.histogram += np.bincount(buckets.ravel(), minlength=self.histogram.size).reshape(self.histogram.shape)
+
+        for j in range(len(self.low)):
+            buckets = np.searchsorted(self.sketch_edges[:, j], values[:, j], side='right')
+            self.sketch[j] += np.bincount(buckets, minlength=self.sketch.shape[1])
+
+    def quantiles(self, qs=QUANTILES):
+        """Approximate quantiles per feature, shape (len(qs), n_features)"""
+        result = np.full((len(qs), len(self.low)), np.nan)
+        if self.count == 0:
+            return result
+
+        targets = np.asarray(qs) * self.count
+        for j in range(len(self.low)):
+            inner = self.sketch_edges[:, j]
+            edges = np.concatenate([[min(self.min[j], inner[0])], inner, [max(self.max[j], inner[-1])]])
+            cumulative = np.concatenate([[0], np.cumsum(self.sketch[j])])
+            result[:, j] = np.clip(np.interp(targets, cumulative, edges), self.min[j], self.max[j])
+        return result
+
+    def to_dict(self):
+        variance = self.m2 / self.count if self.count else np.full(len(self.low), np.nan)
+        return {
+            'count': int(self.count),
+            'mean': _rounded(self.mean),
+            'variance': _rounded(variance),
+            'std': _rounded(np.sqrt(variance)),
+            'min': _rounded(self.min),
+            'max': _rounded(self.max),
+            'quantiles': {str(q): _rounded(row) for q, row in zip(QUANTILES, self.quantiles())},
+            'histogram': self.histogram.tolist()
+        }
+
+
+class ScoreAccumulator:
+    """Confusion matrix and per-class score histograms for streamed model metrics"""
+
+    def __init__(self, bins=SCORE_BINS, score_range=SCORE_RANGE):
+        self.bins = bins
+        self.low, self.high = score_range
+        self.histogram = np.zeros((2, bins), dtype=np.int64)  # rows: legitimate, fraud
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # [[TN, FP], [FN, TP]]
+
+    def update(self, scores, is_fraud, labels):
+        labels = labels.astype(np.int64)
+        predicted = is_fraud.astype(np.int64)
+        self.confusion += np.bincount(labels * 2 + predicted, minlength=4).reshape(2, 2)
+
+        buckets = np.clip(((scores - self.low) / (self.high - self.low) * self.bins).astype(np.int64), 0, self.bins - 1)
+        self.histogram += np.bincount(labels * self.bins + buckets, minlength=2 * self.bins).reshape(2, self.bins)
+
+    def roc_auc(self):
+        """P(fraud scores lower than legitimate), ties in a bin counted as half"""
+        legit, fraud = self.histogram
+        if legit.sum() == 0 or fraud.sum() == 0:
+            return None
+        legit_above = legit.sum() - np.cumsum(legit)
+        return float((fraud * (legit_above + 0.5 * legit)).sum() / (legit.sum() * fraud.sum()))
+
+    def metrics(self):
+        (tn, fp), (fn, tp) = self.confusion.tolist()
+        total = tn + fp + fn + tp
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        return {
+            'Recall': recall,
+            'Precision': precision,
+            'F1 Score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            'ROC AUC': self.roc_auc(),
+            'Accuracy': (tp + tn) / total if total else 0.0,
+            'Fraud Rate': (tp + fn) / total if total else 0.0,
+            'Flagged Rate': (tp + fp) / total if total else 0.0
+        }
+
+
+def compute_feature_stats(source, model, scaler, features, chunksize=100_000,
+                          progress=None, decision_function=None):
+    """Compute feature statistics and model metrics over a transactions CSV in one chunked pass.
+
+    Rows are grouped into 'all' and, when the ``Class`` label is present, 'legitimate'
+    and 'fraud'. A ``fraud_score`` column (as written by batch_score.py) is reused
+    instead of scoring the rows again. Histogram and sketch edges are fixed from the
+    first chunk's distribution, so every later chunk shares the same bins.
+    Returns a JSON-serialisable dict; ``progress(rows, elapsed_seconds)`` is called per chunk.
+    """
+    names = model_features(features)
+    groups = {}
+    scores = ScoreAccumulator()
+    labelled = False
+
+    start = time.perf_counter()
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        values = chunk[names].to_numpy(dtype=np.float64)
+
+        if not groups:
+            low, high = np.quantile(values, HISTOGRAM_RANGE, axis=0)
+            high = np.where(high > low, high, low + 1.0)
+            sketch_edges = np.quantile(values, np.linspace(0, 1, SKETCH_BINS + 1), axis=0)
+            labelled = LABEL_COLUMN in chunk.columns
+            for name in ('all', 'legitimate', 'fraud') if labelled else ('all',):
+                groups[name] = FeatureAccumulator(low, high, sketch_edges)
+
+        groups['all'].update(values)
+
+        if labelled:
+            labels = chunk[LABEL_COLUMN].to_numpy() == 1
+            groups['legitimate'].update(values[~labels])
+            groups['fraud'].update(values[labels])
+
+            if 'fraud_score' in chunk.columns:
+                chunk_scores = chunk['fraud_score'].to_numpy(dtype=np.float64)
+                is_fraud = chunk_scores < 0
+            else:
+                chunk_scores, is_fraud, _ = score_values(values, model, scaler, decision_function)
+            scores.update(chunk_scores, is_fraud, labels)
+
+        if progress is not None:
+            progress(groups['all'].count, time.perf_counter() - start)
+
+    if not groups:
+        raise ValueError("No rows to compute statistics from")
+
+    stats = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'source': os.path.basename(source) if isinstance(source, str) else None,
+        'rows': groups['all'].count,
+        'seconds': round(time.perf_counter() - start, 3),
+        'features': names,
+        'quantiles': list(QUANTILES),
+        'histogram_edges': {'bins': HISTOGRAM_BINS, 'low': _rounded(low), 'high': _rounded(high)},
+        'groups': {name: group.to_dict() for name, group in groups.items()},
+        'metrics': None,
+        'confusion_matrix': None
+    }
+    if labelled:
+        stats['metrics'] = scores.metrics()
+        stats['confusion_matrix'] = scores.confusion.tolist()
+    return stats
+
+
+def feature_stats_path(models_dir, version):
+    """Stats live next to the model, e.g. models/feature_stats_20250508_2214.json"""
+    name = 'feature_stats.json' if version == UNVERSIONED else f'feature_stats_{version}.json'
+    return os.path.join(models_dir, name)
+
+
+def save_feature_stats(stats, path):
+    with open(path, 'w') as f:
+        json.dump(stats, f, separators=(',', ':'))
+
+
+def load_feature_stats(models_dir, version):
+    """Return the stored stats for a model version, or None if they have not been computed"""
+    path = feature_stats_path(models_dir, version)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _rounded(values, digits=6):
+    return [None if not np.isfinite(v) else round(float(v), digits) for v in values]
@@ -1,22 +1,36 @@
-import joblib
 import os
+import sys
 import streamlit as st
 
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.artifact_registry import ArtifactRegistry, load_file
 
-def load_model_artifacts():
+MODELS_DIR = os.environ.get('FRAUD_MODELS_DIR', 'models')
+ARTIFACT_NAMES = ('isolation_forest', 'scaler', 'features')
+
+
+def _load_bundle(paths):
+    """Load one artifact version as a (model, scaler, features) tuple"""
+    return tuple(load_file(paths[name]) for name in ARTIFACT_NAMES)
+
+
+def create_registry(models_dir=MODELS_DIR):
+    """Registry over versioned artifacts such as models/isolation_forest_20250508_2214.pkl"""
+    return ArtifactRegistry(models_dir, ARTIFACT_NAMES, _load_bundle)
+
+
+def load_model_artifacts(registry=None):
     """Load model artifacts with error handling"""
     try:
-        # Load from the correct path (adjust as needed)
-        model_path = os.path.join('models/isolation_forest_20250508_2214.pkl')
-        scaler_path = os.path.join('models/scaler_20250508_2214.pkl')
-        features_path = os.path.join('models/features_20250508_2214.pkl')
-
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        features = joblib.load(features_path)
+        # Without a shared registry, load the latest version found in the models directory
+        if registry is None:
+            registry = create_registry()
+            registry.load()
 
+        model, scaler, features = registry.get()
         return model, scaler, features
 
     except Exception as e:
         st.error(f"Error loading model artifacts: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import joblib
+import numpy as np
+
+# Per-worker state: the model and the memory-mapped input/output files opened so far
+_worker_model = None
+_worker_arrays = {}
+
+
+def _init_worker(model_path):
+    global _worker_model
+    if model_path is not None:
+        # Spawned workers map the joblib artifact instead of receiving a pickled copy
+        _worker_model = joblib.load(model_path, mmap_mode='r')
+
+
+def _open(path, mode):
+    array = _worker_arrays.get(path)
+    if array is None:
+        array = _worker_arrays[path] = np.load(path, mmap_mode=mode)
+    return array
+
+
+def _score_block(task):
+    input_path, output_path, start, stop = task
+    output = _open(output_path, 'r+')
+    output[start:stop] = _worker_model.decision_function(_open(input_path, 'r')[start:stop])
+    output.flush()
+    return stop - start
+
+
+def _forget_arrays(paths):
+    for path in paths:
+        _worker_arrays.pop(path, None)
+    return len(paths)
+
+
+class ParallelScorer:
+    """Shard rows into blocks and run decision_function on them in a process pool.
+
+    Nothing large is pickled between processes. Each call writes the scaled input to a
+    memory-mapped .npy file, workers score row blocks from it in place, and they write
+    scores into a shared output file. On platforms with ``fork`` the workers inherit the
+    parent's fitted model copy-on-write. Elsewhere the model is dumped once as an
+    uncompressed joblib artifact that every worker loads with ``mmap_mode='r'``.
+    Use as a context manager so the pool and temporary files are cleaned up.
+    """
+
+    def __init__(self, model, n_workers=None, block_size=20_000, workdir=None):
+        global _worker_model
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.block_size = block_size
+        self.model = model
+        self._calls = 0
+        self._tmpdir = tempfile.mkdtemp(prefix='fraud_scoring_', dir=workdir)
+        self._pool = None
+
+        if self.n_workers > 1:
+            if 'fork' in multiprocessing.get_all_start_methods():
+                _worker_model = model
+                context, model_path = multiprocessing.get_context('fork'), None
+            else:
+                model_path = os.path.join(self._tmpdir, 'model.joblib')
+                joblib.dump(model, model_path)
+                context = multiprocessing.get_context('spawn')
+            self._pool = context.Pool(self.n_workers, initializer=_init_worker, initargs=(model_path,))
+
+    def decision_function(self, scaled):
+        """Drop-in replacement for model.decision_function on already-scaled rows"""
+        scaled = np.asarray(scaled, dtype=np.float64)
+        if self._pool is None or len(scaled) <= self.block_size:
+            return self.model.decision_function(scaled)
+
+        self._calls += 1
+        input_path = os.path.join(self._tmpdir, f'input_{self._calls}.npy')
+        output_path = os.path.join(self._tmpdir, f'scores_{self._calls}.npy')
+        np.save(input_path, scaled)
+        output = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float64, shape=(len(scaled),))
+        del output  # header and size are on disk; workers open it themselves
+
+        tasks = [(input_path, output_path, start, min(start + self.block_size, len(scaled)))
+                 for start in range(0, len(scaled), self.block_size)]
+        self._pool.map(_score_block, tasks, chunksize=1)
+
+        scores = np.array(np.load(output_path, mmap_mode='r'))
+        self._pool.map(_forget_arrays, [[input_path, output_path]] * self.n_workers, chunksize=1)
+        os.remove(input_path)
+        os.remove(output_path)
+        return scores
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
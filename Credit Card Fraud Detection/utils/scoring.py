@@ -0,0 +1,94 @@
+import time
+import numpy as np
+import pandas as pd
+
+SCORE_COLUMNS = ['fraud_score', 'prediction', 'confidence']
+
+
+def model_features(features):
+    """Feature columns the scaler and model expect ('Class' is the label, not an input)"""
+    return [f for f in features if f != 'Class']
+
+
+def score_values(values, model, scaler, decision_function=None):
+    """Scale and score a 2-D array of feature values with a single decision_function call.
+
+    Returns (scores, is_fraud, confidence). IsolationForest.predict labels a row -1
+    exactly when its decision_function is negative, so the label is derived from the
+    scores instead of running every tree a second time through predict.
+    ``decision_function`` replaces model.decision_function, e.g. ParallelScorer's.
+    """
+    scores = (decision_function or model.decision_function)(scaler.transform(values))
+    is_fraud = scores < 0
+
+    # Convert to probability using sigmoid
+    fraud_prob = 1 / (1 + np.exp(-scores))
+    confidence = np.where(is_fraud, fraud_prob, 1 - fraud_prob)
+    return scores, is_fraud, confidence
+
+
+def score_frame(frame, model, scaler, features, decision_function=None):
+    """Return a DataFrame of scores, labels and confidences for every row of frame"""
+    values = frame[model_features(features)].to_numpy(dtype=np.float64)
+    scores, is_fraud, confidence = score_values(values, model, scaler, decision_function)
+    return pd.DataFrame({
+        'fraud_score': scores,
+        'prediction': np.where(is_fraud, 'Fraud', 'Legitimate'),
+        'confidence': confidence
+    }, index=frame.index)
+
+
+def score_csv(source, destination, model, scaler, features, chunksize=100_000,
+              keep_columns=None, progress=None, decision_function=None):
+    """Score a transactions CSV chunk by chunk, appending results to destination as they are ready.
+
+    Memory stays bounded by ``chunksize`` regardless of file size. ``keep_columns``
+    selects input columns copied to the output (all of them by default).
+    ``progress(rows, elapsed_seconds, fraction)`` is called after every chunk;
+    ``fraction`` is the share of the input consumed, or None when it cannot be told.
+    ``decision_function`` is passed through to score_values.
+    Returns a summary dict with row, fraud and throughput counts.
+    """
+    owns_source = isinstance(source, str)
+    handle = open(source, 'rb') if owns_source else source
+    total_bytes = _stream_size(handle)
+
+    rows = 0
+    frauds = 0
+    start = time.perf_counter()
+    try:
+        for i, chunk in enumerate(pd.read_csv(handle, chunksize=chunksize)):
+            scored = score_frame(chunk, model, scaler, features, decision_function)
+            frauds += int((scored['prediction'] == 'Fraud').sum())
+
+            passthrough = chunk if keep_columns is None else chunk[keep_columns]
+            pd.concat([passthrough, scored], axis=1).to_csv(
+                destination, mode='w' if i == 0 else 'a', header=i == 0, index=False
+            )
+
+            rows += len(chunk)
+            if progress is not None:
+                fraction = min(handle.tell() / total_bytes, 1.0) if total_bytes else None
+                progress(rows, time.perf_counter() - start, fraction)
+    finally:
+        if owns_source:
+            handle.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'frauds': frauds,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def _stream_size(handle):
+    try:
+        position = handle.tell()
+        handle.seek(0, 2)
+        size = handle.tell()
+        handle.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
@@ -53,34 +53,69 @@ def plot_confusion_matrix(cm):
     return fig
 
 
-def plot_feature_distributions():
-    """Show feature distributions (simplified)"""
-    # This would normally use your actual feature distributions
-    np.random.seed(42)
-    data = {
-        'Feature': [f'V{i}' for i in range(1, 31)],
-        'Mean': np.random.normal(0, 1, 30),
-        'StdDev': np.abs(np.random.normal(0.5, 0.2, 30))
-    }
-    df = pd.DataFrame(data)
+def plot_feature_distributions(stats):
+    """Per-class feature means with standard deviations from the stored feature statistics"""
+    groups = [g for g in ('legitimate', 'fraud') if g in stats['groups']] or ['all']
+    df = pd.concat([
+        pd.DataFrame({
+            'Feature': stats['features'],
+            'Mean': stats['groups'][group]['mean'],
+            'StdDev': stats['groups'][group]['std'],
+            'Group': group.title()
+        })
+        for group in groups
+    ])
 
     fig = px.bar(
         df,
         x='Feature',
         y='Mean',
         error_y='StdDev',
+        color='Group',
+        barmode='group',
         title="Feature Distributions (Mean ± Std Dev)",
-        color='Mean',
-        color_continuous_scale='RdYlGn'
+        color_discrete_map={'Legitimate': '#4CAF50', 'Fraud': '#F44336', 'All': '#2196F3'}
     )
     fig.update_layout(
         xaxis_tickangle=-90,
-        showlegend=False,
         height=600
     )
     return fig
 
 
+def plot_feature_histogram(stats, feature):
+    """Histogram of one feature per class, normalised so rare fraud rows stay visible"""
+    j = stats['features'].index(feature)
+    edges = stats['histogram_edges']
+    low, high, bins = edges['low'][j], edges['high'][j], edges['bins']
+    width = (high - low) / bins
+    # Underflow and overflow buckets are drawn as one extra bin at each end
+    centers = low + width * (np.arange(bins + 2) - 0.5)
+
+    groups = [g for g in ('legitimate', 'fraud') if g in stats['groups']] or ['all']
+    df = pd.concat([
+        pd.DataFrame({
+            feature: centers,
+            'Share': np.asarray(stats['groups'][group]['histogram'][j]) / max(stats['groups'][group]['count'], 1),
+            'Group': group.title()
+        })
+        for group in groups
+    ])
+
+    fig = px.bar(
+        df,
+        x=feature,
+        y='Share',
+        color='Group',
+        barmode='overlay',
+        opacity=0.6,
+        title=f"{feature} Distribution",
+        color_discrete_map={'Legitimate': '#4CAF50', 'Fraud': '#F44336', 'All': '#2196F3'}
+    )
+    fig.update_layout(bargap=0, yaxis_tickformat='.1%')
+    return fig
+
+
 def generate_simulation_results(avg_transaction, fraud_rate, volume, multiplier):
     """Generate business impact simulation results"""
     potential_losses = avg_transaction * volume * fraud_rate * multiplier
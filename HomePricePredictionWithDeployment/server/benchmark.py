@@ -0,0 +1,52 @@
+import random
+import time
+import warnings
+import numpy as np
+import util
+
+
+def sample_properties(n, seed=0):
+    rng = random.Random(seed)
+    locations = util.get_location_names() + ['Some Other Place']
+    return [(rng.choice(locations), rng.choice([600, 1000, 1200, 1500, 2400]),
+             rng.randint(1, 5), rng.randint(1, 5)) for _ in range(n)]
+
+
+def time_calls(fn, properties):
+    timings = np.empty(len(properties))
+    for i, (location, sqft, bhk, bath) in enumerate(properties):
+        start = time.perf_counter()
+        fn(location, sqft, bhk, bath)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+
+def generic(location, sqft, bhk, bath):
+    # Linear scan + dense one-hot vector + model.predict, as before the location index
+    artifacts = util._artifacts()
+    try:
+        loc_index = artifacts['data_columns'].index(location.lower())
+    except ValueError:
+        loc_index = -1
+    return util._predict_price_generic(artifacts, loc_index, sqft, bhk, bath)
+
+
+def indexed(location, sqft, bhk, bath):
+    return util._predict_price(util._artifacts(), location, sqft, bhk, bath)
+
+
+if __name__ == '__main__':
+    util.load_saved_artifacts()
+    properties = sample_properties(5000)
+
+    # The generic path passes model.predict a bare array, as the original code did, so sklearn
+    # warns on every call that X has no feature names; keep that out of the results
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+
+        mismatches = sum(indexed(*p) != generic(*p) for p in properties[:1000])
+        print(f"Parity: {mismatches} mismatches out of 1000 (rounded to 2 decimals)")
+
+        for name, fn in [('model.predict path', generic), ('Indexed scorer', indexed)]:
+            timings = time_calls(fn, properties)
+            print(f"{name:>18}: p50 {np.percentile(timings, 50):8.2f} us   p99 {np.percentile(timings, 99):8.2f} us")
@@ -1,7 +1,32 @@
-from flask import Flask, request, jsonify
+import os
+import io
+import csv
+import json
+import sys
+import tempfile
+from flask import Flask, Response, request, jsonify, stream_with_context
 import util
 
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.batching import MicroBatcher
+
 app = Flask(__name__)
+app.config['BATCH_CHUNK_SIZE'] = int(os.environ.get('HOME_PRICE_BATCH_CHUNK_SIZE', 5000))
+# Uploads larger than this are spooled to a temporary file rather than held in memory
+app.config['BATCH_SPOOL_SIZE'] = int(os.environ.get('HOME_PRICE_BATCH_SPOOL_SIZE', 16 * 1024 * 1024))
+
+BATCH_FIELDS = ['location', 'total_sqft', 'bhk', 'bath']
+BATCH_RESULT_FIELDS = ['row'] + BATCH_FIELDS + ['estimated_price', 'error']
+
+# Opt-in request coalescing: concurrent /predict_home_price calls share one predict call
+batcher = None
+if os.environ.get('HOME_PRICE_MICRO_BATCHING') == '1':
+    batcher = MicroBatcher(
+        util.get_estimated_prices,
+        max_batch_size=int(os.environ.get('HOME_PRICE_MICRO_BATCH_SIZE', 64)),
+        max_wait_ms=float(os.environ.get('HOME_PRICE_MICRO_BATCH_WAIT_MS', 5))
+    )
 
 @app.route('/get_location_names', methods=['GET'])
 def get_location_names():
@@ -19,14 +44,191 @@ def predict_home_price():
     bhk = int(request.form['bhk'])
     bath = int(request.form['bath'])
 
+    if batcher is not None:
+        estimated_price = batcher.submit((location, total_sqft, bhk, bath))
+    else:
+        estimated_price = util.get_estimated_price(location,total_sqft,bhk,bath)
+
     response = jsonify({
-        'estimated_price': util.get_estimated_price(location,total_sqft,bhk,bath)
+        'estimated_price': estimated_price
     })
     response.headers.add('Access-Control-Allow-Origin', '*')
 
     return response
 
+def iter_ndjson(stream):
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+def open_batch_records():
+    """Open the batch input as (records iterator, stream to close) from a CSV upload, an NDJSON body or a JSON array.
+
+    Called in the view, before the streaming response starts: Werkzeug closes uploaded
+    files once the view returns, so an upload is first copied to a spooled file the
+    response owns, and input that is unusable as a whole raises ValueError here, to be
+    answered with a 400 instead of failing after the 200 headers were sent.
+    """
+    if 'file' in request.files:
+        upload = request.files['file']
+        is_csv = upload.mimetype == 'text/csv' or upload.filename.lower().endswith('.csv')
+        spool = tempfile.SpooledTemporaryFile(max_size=app.config['BATCH_SPOOL_SIZE'])
+        upload.save(spool)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding='utf-8')
+    else:
+        is_csv = request.mimetype == 'text/csv'
+        stream = io.TextIOWrapper(request.stream, encoding='utf-8')
+
+    try:
+        if is_csv:
+            records = csv.DictReader(stream)
+            missing = [field for field in BATCH_FIELDS if field not in (records.fieldnames or [])]
+            if missing:
+                raise ValueError('CSV is missing column: ' + missing[0])
+            return records, stream
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+            return iter_ndjson(stream), stream
+
+        # A plain JSON array has to be parsed whole; use CSV or NDJSON for very large feeds
+        try:
+            records = json.load(stream)
+        except ValueError:
+            raise ValueError('Body must be a JSON array of properties')
+        if isinstance(records, dict):
+            records = records.get('properties')
+        if not isinstance(records, list):
+            raise ValueError('Body must be a JSON array of properties')
+        return iter(records), stream
+    except (ValueError, UnicodeDecodeError):
+        stream.close()
+        raise
+
+def parse_batch_record(record):
+    if not isinstance(record, dict):
+        raise ValueError('Record must be an object')
+    missing = [field for field in BATCH_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError('Missing field: ' + missing[0])
+    return (str(record['location']), float(record['total_sqft']), int(record['bhk']), int(record['bath']))
+
+def score_batch_chunk(chunk, first_row):
+    """Score one chunk of raw records with a single vectorized call, keeping per-row errors"""
+    results = []
+    properties = []
+    for offset, record in enumerate(chunk):
+        result = {'row': first_row + offset}
+        try:
+            result.update(zip(BATCH_FIELDS, parse_batch_record(record)))
+            properties.append(tuple(result[field] for field in BATCH_FIELDS))
+        except (ValueError, TypeError) as e:
+            result['error'] = str(e)
+        results.append(result)
+
+    prices = iter(util.get_estimated_prices(properties, use_cache=False))
+    for result in results:
+        if 'error' not in result:
+            result['estimated_price'] = next(prices)
+    return results
+
+@app.route('/predict_home_price_batch', methods=['POST'])
+def predict_home_price_batch():
+    output_format = request.args.get('format')
+    if output_format is None:
+        is_csv_upload = request.mimetype == 'text/csv' or 'file' in request.files
+        output_format = 'csv' if is_csv_upload else 'ndjson'
+    if output_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+
+    chunk_size = app.config['BATCH_CHUNK_SIZE']
+    try:
+        records, stream = open_batch_records()
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        try:
+            if output_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.DictWriter(buffer, fieldnames=BATCH_RESULT_FIELDS)
+                writer.writeheader()
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+            chunk = []
+            row = 0
+            while True:
+                for record in records:
+                    chunk.append(record)
+                    if len(chunk) == chunk_size:
+                        break
+                if not chunk:
+                    break
+
+                results = score_batch_chunk(chunk, row)
+                row += len(chunk)
+                chunk = []
+
+                if output_format == 'csv':
+                    writer.writerows(results)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield ''.join(json.dumps(result) + '\n' for result in results)
+        finally:
+            stream.close()
+
+    mimetype = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers.add('Access-Control-Allow-Origin', '*')
+
+    return response
+
+@app.route('/artifacts', methods=['GET'])
+def artifacts():
+    response = jsonify(util.get_artifact_stats())
+    response.headers.add('Access-Control-Allow-Origin', '*')
+
+    return response
+
+@app.route('/reload_artifacts', methods=['POST'])
+def reload_artifacts():
+    version = request.form.get('version')
+    if util.reload_artifacts_async(version) is None:
+        response = jsonify({'status': 'already current', 'version': util.get_artifact_stats()['active_version']})
+        status = 200
+    else:
+        response = jsonify({'status': 'loading', 'version': version or 'latest'})
+        status = 202
+    response.headers.add('Access-Control-Allow-Origin', '*')
+
+    return response, status
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    response = jsonify(util.get_cache_stats())
+    response.headers.add('Access-Control-Allow-Origin', '*')
+
+    return response
+
+@app.route('/batching_stats', methods=['GET'])
+def batching_stats():
+    if batcher is None:
+        response = jsonify({'enabled': False})
+    else:
+        response = jsonify({'enabled': True, 'stats': batcher.stats()})
+    response.headers.add('Access-Control-Allow-Origin', '*')
+
+    return response
+
 if __name__ == "__main__":
     print("Starting Python Flask Server For Home Price Prediction...")
     util.load_saved_artifacts()
+    if batcher is not None:
+        batcher.start()
     app.run()
\ No newline at end of file
@@ -1,47 +1,173 @@
-import pickle
-import json
+import itertools
+import os
+import sys
 import numpy as np
+from cache import PredictionCache
 
-__locations = None
-__data_columns = None
-__model = None
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+from common.artifact_registry import ArtifactRegistry, load_file
+
+__registry = None
+__load_generation = itertools.count(1)
+__artifact_names = {'columns': 'columns', 'model': 'real_estate_prices_model'}
+__cache = PredictionCache(maxsize=int(os.environ.get('HOME_PRICE_CACHE_SIZE', 10000)),
+                          ttl=float(os.environ.get('HOME_PRICE_CACHE_TTL', 3600)))
+
+def _artifacts():
+    if __registry is None:
+        raise Exception("Artifacts not loaded")
+    return __registry.get()
+
+def _cache_key(artifacts,location,sqft,bhk,bath):
+    # The load generation keeps prices computed by replaced artifacts from ever being served,
+    # even when a reload re-read changed files under the same name
+    return (artifacts['generation'], location.lower(), float(sqft), float(bhk), float(bath))
 
 def get_estimated_price(location,sqft,bhk,bath):
-    try:
-        loc_index = __data_columns.index(location.lower())
-    except:
-        loc_index = -1
+    artifacts = _artifacts()
+    key = _cache_key(artifacts,location,sqft,bhk,bath)
+    price = __cache.get(key)
+    if price is None:
+        price = _predict_price(artifacts,location,sqft,bhk,bath)
+        __cache.put(key, price)
+    return price
+
+
+def _predict_price(artifacts,location,sqft,bhk,bath):
+    loc_index = artifacts['location_index'].get(location.lower(), -1)
+    coef = artifacts['coef']
+    if coef is None:
+        return _predict_price_generic(artifacts,loc_index,sqft,bhk,bath)
+
+    # Linear model: intercept + sqft/bath/bhk terms + the single active location weight
+    price = artifacts['intercept'] + coef[0] * sqft + coef[1] * bath + coef[2] * bhk
+    if loc_index >= 0:
+        price += coef[loc_index]
+    return round(price, 2)
+
 
-    x = np.zeros(len(__data_columns))
+def _predict_price_generic(artifacts,loc_index,sqft,bhk,bath):
+    x = np.zeros(len(artifacts['data_columns']))
     x[0] = sqft
     x[1] = bath
     x[2] = bhk
     if loc_index>=0:
         x[loc_index] = 1
 
-    return round(__model.predict([x])[0],2)
+    return round(artifacts['model'].predict([x])[0],2)
+
+
+def _predict_prices(artifacts, properties):
+    location_index = artifacts['location_index']
+    loc_index = np.array([location_index.get(p[0].lower(), -1) for p in properties])
+    numeric = np.array([(p[1], p[3], p[2]) for p in properties], dtype=float).reshape(-1, 3)  # sqft, bath, bhk
+
+    if artifacts['coef'] is not None:
+        coef = artifacts['coef_array']
+        return artifacts['intercept'] + numeric @ coef[:3] + np.where(loc_index >= 0, coef[loc_index], 0.0)
+
+    x = np.zeros((len(properties), len(artifacts['data_columns'])))
+    x[:, :3] = numeric
+    rows = np.flatnonzero(loc_index >= 0)
+    x[rows, loc_index[rows]] = 1
+    return artifacts['model'].predict(x)
+
+
+def get_estimated_prices(properties, use_cache=True):
+    """Score a list of (location, sqft, bhk, bath) tuples, with one vectorized call for all cache misses"""
+    artifacts = _artifacts()
+    if not use_cache:
+        return [round(price, 2) for price in _predict_prices(artifacts, properties).tolist()] if properties else []
+
+    keys = [_cache_key(artifacts, *p) for p in properties]
+    prices = [__cache.get(key) for key in keys]
+    misses = [i for i, price in enumerate(prices) if price is None]
+    if not misses:
+        return prices
 
+    for i, price in zip(misses, _predict_prices(artifacts, [properties[i] for i in misses]).tolist()):
+        prices[i] = round(price, 2)
+        __cache.put(keys[i], prices[i])
+    return prices
 
-def load_saved_artifacts():
+
+def _load_bundle(paths):
+    """Load one artifact version with its location lookup and, for linear models, the coefficient table"""
+    data_columns = load_file(paths[__artifact_names['columns']])['data_columns']
+    model = load_file(paths[__artifact_names['model']])
+
+    # first 3 columns are sqft, bath, bhk; location names are already lowercase
+    location_index = {}
+    for i, name in enumerate(data_columns[3:], start=3):
+        location_index.setdefault(name.lower(), i)
+
+    coef = getattr(model, 'coef_', None)
+    intercept = getattr(model, 'intercept_', None)
+    if coef is not None and intercept is not None and np.ndim(coef) == 1 and len(coef) == len(data_columns):
+        coef = [float(c) for c in coef]
+        intercept = float(intercept)
+    else:
+        coef = None
+        intercept = None
+
+    return {
+        'version': os.path.basename(str(paths[__artifact_names['model']])),
+        'generation': next(__load_generation),
+        'data_columns': data_columns,
+        'locations': data_columns[3:],
+        'model': model,
+        'location_index': location_index,
+        'intercept': intercept,
+        'coef': coef,
+        'coef_array': np.asarray(coef) if coef is not None else None
+    }
+
+
+def _on_swap(previous, version):
+    # Cached prices belong to the previous artifacts, even if the version name is unchanged
+    __cache.clear()
+
+
+def _artifacts_dir():
+    if 'HOME_PRICE_ARTIFACTS_DIR' in os.environ:
+        return os.environ['HOME_PRICE_ARTIFACTS_DIR']
+    # The deployed layout keeps artifacts in ./artifacts; the repository ships them next to the server
+    return './artifacts' if os.path.isdir('./artifacts') else '.'
+
+
+def load_saved_artifacts(version=None):
     print("loading saved artifacts...start")
-    global  __data_columns
-    global __locations
+    global __registry
 
-    with open("./artifacts/columns.json", "r") as f:
-        __data_columns = json.load(f)['data_columns']
-        __locations = __data_columns[3:]  # first 3 columns are sqft, bath, bhk
+    if __registry is None:
+        __registry = ArtifactRegistry(_artifacts_dir(), __artifact_names.values(), _load_bundle, on_swap=_on_swap)
+    __registry.load(version)
 
-    global __model
-    if __model is None:
-        with open('./artifacts/real_estate_prices_model.pickle', 'rb') as f:
-            __model = pickle.load(f)
+    watch_seconds = float(os.environ.get('HOME_PRICE_ARTIFACT_WATCH_SECONDS', 0))
+    if watch_seconds > 0:
+        __registry.watch(watch_seconds)
     print("loading saved artifacts...done")
 
+def reload_artifacts_async(version=None):
+    """Load a new artifact version in the background; None if the latest one is already active"""
+    if __registry is None:
+        raise Exception("Artifacts not loaded")
+    return __registry.reload_async(version)
+
+def get_artifact_stats():
+    if __registry is None:
+        raise Exception("Artifacts not loaded")
+    return __registry.stats()
+
 def get_location_names():
-    return __locations
+    return _artifacts()['locations']
 
 def get_data_columns():
-    return __data_columns
+    return _artifacts()['data_columns']
+
+def get_cache_stats():
+    return __cache.stats()
 
 if __name__ == '__main__':
     load_saved_artifacts()
@@ -49,4 +175,4 @@ if __name__ == '__main__':
     print(get_estimated_price('1st Phase JP Nagar',1000, 3, 3))
     print(get_estimated_price('1st Phase JP Nagar', 1000, 2, 2))
     print(get_estimated_price('Kalhalli', 1000, 2, 2)) # other location
-    print(get_estimated_price('Ejipura', 1000, 2, 2))  # other location
\ No newline at end of file
+    print(get_estimated_price('Ejipura', 1000, 2, 2))  # other location
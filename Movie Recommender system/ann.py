@@ -0,0 +1,105 @@
+import numpy as np
+
+
+class InvertedIndex:
+    """Approximate cosine neighbours from a pruned inverted index over the binary count vectors.
+
+    Candidates for a movie are the movies sharing one of its terms (a name or a genre
+    word). Terms in at most ``full_df`` movies contribute every such movie; more common
+    terms (genres, first names) contribute only their ``max_postings`` shortest movies,
+    which are the ones that term makes most similar. Every candidate is scored exactly,
+    cosine = shared terms / sqrt(terms of each), counting rare terms from the postings
+    and common ones with a popcount over bit-packed membership, so only recall is
+    traded away: larger limits raise recall and the candidates scored per query.
+
+    Random-hyperplane LSH was tried first, but these vectors have about 11 terms and
+    typical top-10 cosines of 0.3-0.5, so it needed a third of the catalogue as
+    candidates for 95% recall; python benchmark.py --only ann compares the settings.
+    """
+
+    def __init__(self, matrix, full_df=500, max_postings=50):
+        self.full_df = full_df
+        self.max_postings = max_postings
+        self.matrix = (matrix.tocsr() > 0).astype(np.int8)
+        self.matrix.sort_indices()
+        self.n = self.matrix.shape[0]
+        self.lengths = np.diff(self.matrix.indptr)
+
+        # Postings of each term ordered by movie length (fewest terms first), then row
+        by_term = self.matrix.tocsc()
+        df = np.diff(by_term.indptr)
+        terms = np.repeat(np.arange(len(df)), df)
+        order = np.lexsort((by_term.indices, self.lengths[by_term.indices], terms))
+        rank = np.arange(len(order)) - np.repeat(by_term.indptr[:-1], df)
+        limit = np.where(df <= full_df, df, max_postings)
+        self.postings = by_term.indices[order][rank < limit[terms]].astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.minimum(df, limit))])
+        self.pruned = df > full_df
+
+        # Membership of the pruned (common) terms, 64 terms per word, for exact shared counts
+        common = np.flatnonzero(self.pruned)
+        column = np.full(len(df), -1)
+        column[common] = np.arange(len(common))
+        self.bits = self._pack(self.matrix, column, len(common))
+        self._common_column = column
+
+    def _pack(self, matrix, column, n_common):
+        words = np.zeros((matrix.shape[0], max(1, -(-n_common // 64))), dtype=np.uint64)
+        rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        cols = column[matrix.indices]
+        rows, cols = rows[cols >= 0], cols[cols >= 0]
+        np.bitwise_or.at(words, (rows, cols // 64), np.left_shift(np.uint64(1), (cols % 64).astype(np.uint64)))
+        return words
+
+    def query(self, matrix, k=10, exclude=None):
+        """(indices, scores) of the approximate top k rows for each query row of a count matrix.
+
+        ``exclude`` gives a row per query that must not be returned (the movie itself).
+        Queries with fewer than k candidates are padded with index -1 and score 0.
+        """
+        queries = (matrix.tocsr() > 0).astype(np.int8)
+        query_lengths = np.diff(queries.indptr)
+        terms = queries.indices
+        lo, counts = self.offsets[terms], self.offsets[terms + 1] - self.offsets[terms]
+        # Positions lo[i] .. lo[i] + counts[i] - 1 for every (query, term) pair, without a Python loop
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        candidate_ids = self.postings[np.arange(counts.sum()) + starts]
+        query_ids = np.repeat(np.repeat(np.arange(queries.shape[0]), query_lengths), counts)
+        # Rare-term postings are complete, so each (query, candidate) occurrence is one shared rare term
+        rare = np.repeat(~self.pruned[terms], counts)
+
+        pairs, inverse = np.unique(query_ids.astype(np.int64) * self.n + candidate_ids, return_inverse=True)
+        shared = np.bincount(inverse, weights=rare, minlength=len(pairs))
+        query_ids, candidate_ids = np.divmod(pairs, self.n)
+        if exclude is not None:
+            keep = candidate_ids != exclude[query_ids]
+            query_ids, candidate_ids, shared = query_ids[keep], candidate_ids[keep], shared[keep]
+
+        query_bits = self._pack(queries, self._common_column, int(self.pruned.sum()))
+        shared += np.bitwise_count(query_bits[query_ids] & self.bits[candidate_ids]).sum(axis=1)
+        scores = shared / np.sqrt(query_lengths[query_ids] * self.lengths[candidate_ids])
+
+        # One stable sort: by query, then score descending; pairs arrive ordered by row, which breaks ties
+        order = np.argsort(query_ids + (1 - scores) / 4, kind='stable')
+        query_ids, candidate_ids, scores = query_ids[order], candidate_ids[order], scores[order]
+        rank = np.arange(len(query_ids)) - np.searchsorted(query_ids, query_ids, side='left')
+        keep = rank < k
+
+        indices = np.full((queries.shape[0], k), -1, dtype=np.int32)
+        top_scores = np.zeros((queries.shape[0], k), dtype=np.float32)
+        indices[query_ids[keep], rank[keep]] = candidate_ids[keep]
+        top_scores[query_ids[keep], rank[keep]] = scores[keep]
+        return indices, top_scores
+
+    def top_k_neighbours(self, k=10, block_size=512, rows=None):
+        """Approximate counterpart of neighbours.top_k_neighbours over the indexed rows"""
+        rows = np.arange(self.n) if rows is None else np.asarray(rows)
+        k = min(k, self.n - 1)
+        indices = np.empty((len(rows), k), dtype=np.int32)
+        scores = np.empty((len(rows), k), dtype=np.float32)
+        # Blocks bound the number of candidate pairs held at once
+        for start in range(0, len(rows), block_size):
+            block = rows[start:start + block_size]
+            indices[start:start + len(block)], scores[start:start + len(block)] = \
+                self.query(self.matrix[block], k, exclude=block)
+        return indices, scores
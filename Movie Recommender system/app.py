@@ -1,60 +1,79 @@
-import pandas as pd
-from flask import Flask, render_template, request
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-
+import os
+import time
+from flask import Flask, jsonify, render_template, request
+from artifacts import append_artifacts, build_artifacts, load_artifacts, locked
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Versioned artifacts written by build_index.py; built here if missing or older than DATA_PATH
+DATA_PATH = os.environ.get('MOVIE_DATA_PATH', os.path.join(APP_DIR, 'datasets', 'main_data.csv'))
+INDEX_DIR = os.environ.get('MOVIE_INDEX_DIR', os.path.join(APP_DIR, 'artifacts'))
+NEIGHBOURS = int(os.environ.get('MOVIE_NEIGHBOURS', 10))
+# Load at import so `gunicorn --preload` maps the artifacts once, before forking workers
+PRELOAD = os.environ.get('MOVIE_PRELOAD', '1') == '1'
+# Autocomplete matches returned by /suggest by default, and the most a client may ask for
+SUGGESTIONS = int(os.environ.get('MOVIE_SUGGESTIONS', 5))
+MAX_SUGGESTIONS = 20
+
+_artifacts = None
+_titles = None
 
+def create_similarity():
+    """Memory-map the current recommender artifacts, building them first if needed"""
+    global _artifacts, _titles
 
-_data = None
-_similarity = None
-_suggestions = None
+    start = time.perf_counter()
+    _artifacts = load_artifacts(INDEX_DIR)
+    if _needs_build(_artifacts):
+        # Workers started together build once: the others wait here, then find the new version current
+        with locked(INDEX_DIR):
+            _artifacts = load_artifacts(INDEX_DIR)
+            if _needs_build(_artifacts):
+                _build(_artifacts)
+                _artifacts = load_artifacts(INDEX_DIR)
 
-def create_similarity():
-    """Optimized similarity matrix creation with memory efficiency"""
-    global _data, _similarity, _suggestions
+    # Title lookup and autocomplete index, memory-mapped with the rest of the version
+    _titles = _artifacts.title_index
 
-    # Load data with optimized data types
-    _data = pd.read_csv('main_data.csv',
-                        dtype={'comb': 'string',
-                               'movie_title': 'category'})  # Reduce memory usage
+    print(f"Loaded recommender artifacts {_artifacts.version} in {time.perf_counter() - start:.3f}s")
 
-    # Create count matrix with limited features
-    cv = CountVectorizer(binary=True, max_features=8000)  # Reduced from default
-    count_matrix = cv.fit_transform(_data['comb'])
 
-    # Use sparse matrix for memory efficiency
-    _similarity = cosine_similarity(count_matrix, dense_output=False)
+def _needs_build(artifacts):
+    return (artifacts is None or artifacts.is_stale(DATA_PATH)
+            or artifacts.manifest['k'] < min(NEIGHBOURS, artifacts.manifest['rows'] - 1))
 
-    # Precompute suggestions
-    _suggestions = _data['movie_title'].str.capitalize().tolist()
 
+def _build(artifacts):
+    # Movies added at the end of DATA_PATH are merged in; any other change is a full rebuild
+    if artifacts is not None and artifacts.manifest['k'] >= NEIGHBOURS and artifacts.is_appended(DATA_PATH):
+        print(f"Appending the new movies in {DATA_PATH} to the recommender artifacts in {INDEX_DIR}")
+        append_artifacts(DATA_PATH, INDEX_DIR)
+    else:
+        print(f"Building recommender artifacts from {DATA_PATH} in {INDEX_DIR}")
+        method, options = 'exact', {}
+        if artifacts is not None:
+            # Keep the neighbour search the current artifacts were built with (e.g. build_index.py --method ann)
+            method, options = artifacts.manifest.get('method', 'exact'), artifacts.manifest.get('options', {})
+        build_artifacts(DATA_PATH, INDEX_DIR, k=NEIGHBOURS, method=method, **options)
 
 
 def rcmd(m):
     """Optimized recommendation function with numpy improvements"""
-    global _data, _similarity
+    global _artifacts
 
     m = m.lower()
 
     # Lazy load data if not loaded
-    if _data is None or _similarity is None:
+    if _artifacts is None:
         create_similarity()
 
-    if m not in _data['movie_title'].unique():
+    idx = _titles.find(m)
+    if idx is None:
         return 'Sorry! Try another movie name'
 
-    # Find index using categorical optimization
-    idx = _data[_data['movie_title'] == m].index[0]
-
-    # Sparse matrix row access
-    row = _similarity[idx].toarray().flatten()
-
-    # Optimized sorting with numpy
-    top_indices = np.argpartition(row, -11)[-11:]  # Get top 11
-    top_indices = top_indices[np.argsort(row[top_indices])][::-1][1:]  # Sort and exclude self
+    # Precomputed neighbours, most similar first and never the movie itself
+    top_indices, _ = _artifacts.neighbours.neighbours(idx, NEIGHBOURS)
 
-    return _data.iloc[top_indices]['movie_title'].tolist()
+    return _artifacts.titles[top_indices].tolist()
 
 
 # converting list of string to list (eg. "["abc","def"]" to ["abc","def"])
@@ -67,24 +86,32 @@ def convert_to_list(my_list):
 
 
 # to get suggestions of movies
-def get_suggestions():
-    """Get cached suggestions to avoid repeated CSV loading"""
-    global _suggestions
-    if _suggestions is None:
+def get_suggestions(query, n=SUGGESTIONS):
+    """Titles matching a partial movie name, capitalized for display"""
+    if _titles is None:
         create_similarity()
-    return _suggestions
+    return [title.capitalize() for title in _titles.suggest(query, n)]
 
 
 # Flask API
 
 app = Flask(__name__)
 
+if PRELOAD:
+    create_similarity()
+
 
 @app.route("/")
 @app.route("/home")
 def home():
-    suggestions = get_suggestions()
-    return render_template('home.html', suggestions=suggestions)
+    return render_template('home.html')
+
+
+@app.route("/suggest")
+def suggest():
+    # autocomplete.js asks for the matches to what has been typed so far
+    n = min(request.args.get('n', SUGGESTIONS, type=int), MAX_SUGGESTIONS)
+    return jsonify(get_suggestions(request.args.get('q', ''), n))
 
 
 @app.route("/similarity", methods=["POST"])
@@ -117,9 +144,6 @@ def recommend():
     rec_movies = request.form['rec_movies']
     rec_posters = request.form['rec_posters']
 
-    # get movie suggestions for auto complete
-    suggestions = get_suggestions()
-
     # call the convert_to_list function for every string that needs to be converted to list
     rec_movies = convert_to_list(rec_movies)
     rec_posters = convert_to_list(rec_posters)
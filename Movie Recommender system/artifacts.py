@@ -0,0 +1,247 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+import numpy as np
+from neighbours import NeighbourIndex, count_matrix
+from titles import TitleIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+# Locks in the artifact root: one held while publishing a version, one while checking and building
+PUBLISH_LOCK_FILE = '.publish.lock'
+BUILD_LOCK_FILE = '.build.lock'
+# Held shared by every process that has the version loaded, so prune_versions leaves it alone
+READERS_FILE = 'readers.lock'
+TITLES_FILE = 'titles.npy'
+VOCABULARY_FILE = 'vocabulary.npy'
+# The binary count matrix in CSR form (all stored values are 1), kept so movies can be appended
+FEATURE_INDICES_FILE = 'feature_indices.npy'
+FEATURE_INDPTR_FILE = 'feature_indptr.npy'
+DATA_DTYPES = {'comb': 'string', 'movie_title': 'category'}
+
+
+def file_sha1(path, size=None):
+    """sha1 of a file, or of its first size bytes"""
+    digest = hashlib.sha1()
+    remaining = os.path.getsize(path) if size is None else size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def locked(root, name=BUILD_LOCK_FILE):
+    """Hold an exclusive lock file in the artifact root, across processes (a no-op where fcntl is missing)"""
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, name), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+class RecommenderArtifacts:
+    """One version of everything the recommender serves from, memory-mapped from disk.
+
+    A version directory holds the movie titles (fixed-width unicode), the title index
+    for lookup and autocomplete, the CountVectorizer vocabulary and the top-K
+    neighbour index, all as .npy files, plus a manifest. Nothing is parsed or fitted
+    at startup, and because the arrays are file-backed, every Gunicorn worker maps
+    the same page-cache pages instead of holding its own copy. The count matrix is
+    stored too, but only read when movies are appended (see append_artifacts).
+    While loaded, the version's readers lock is held shared so it is not pruned.
+    """
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.manifest = manifest
+        self.version = manifest['version']
+        self._readers = open(os.path.join(directory, READERS_FILE), 'a')
+        if fcntl is not None:
+            fcntl.flock(self._readers, fcntl.LOCK_SH)
+        self.titles = np.load(os.path.join(directory, TITLES_FILE), mmap_mode='r')
+        self.title_index = TitleIndex.load(directory, self.titles)
+        self.vocabulary = np.load(os.path.join(directory, VOCABULARY_FILE), mmap_mode='r')
+        self.neighbours = NeighbourIndex.load(directory)
+
+    def is_stale(self, data_path):
+        """True if data_path exists and differs from the file these artifacts were built from"""
+        return os.path.exists(data_path) and file_sha1(data_path) != self.manifest['source_sha1']
+
+    def is_appended(self, data_path):
+        """True if data_path is the file these artifacts were built from with rows added at the end"""
+        size = self.manifest.get('source_bytes')
+        return (size is not None and os.path.exists(os.path.join(self.directory, FEATURE_INDICES_FILE))
+                and os.path.exists(data_path) and os.path.getsize(data_path) > size
+                and file_sha1(data_path, size) == self.manifest['source_sha1'])
+
+    def features(self):
+        """The binary count matrix the neighbours were computed from, one row per movie"""
+        from scipy.sparse import csr_matrix
+        indices = np.load(os.path.join(self.directory, FEATURE_INDICES_FILE))
+        indptr = np.load(os.path.join(self.directory, FEATURE_INDPTR_FILE))
+        return csr_matrix((np.ones(len(indices), dtype=np.int64), indices, indptr),
+                          shape=(len(indptr) - 1, len(self.vocabulary)))
+
+
+def build_artifacts(data_path, root='artifacts', k=10, block_size=512, keep=3, method='exact', **options):
+    """Build a new artifact version from a main_data.csv-style file and make it current; returns its directory.
+
+    ``method`` and ``options`` choose the neighbour search, see NeighbourIndex.build.
+    """
+    import pandas as pd
+    started = time.perf_counter()
+    source_sha1 = file_sha1(data_path)
+    data = pd.read_csv(data_path, dtype=DATA_DTYPES)
+
+    titles = data['movie_title'].astype(str).to_numpy(dtype=str)
+    matrix, vocabulary = count_matrix(data['comb'])
+    neighbours = NeighbourIndex.build(matrix, k, block_size, method, **options)
+    manifest = {
+        'k': int(min(k, len(data) - 1)),
+        'method': method,
+        'options': options,
+    }
+    return _publish(root, data_path, source_sha1, titles, vocabulary, matrix, neighbours, manifest, started, keep)
+
+
+def append_artifacts(data_path, root='artifacts', block_size=512, keep=3):
+    """Add the rows appended to data_path since the current version as a new version; returns its directory.
+
+    The new movies are vectorized with the stored vocabulary (terms it does not have
+    are ignored, as they would be for any movie outside the max_features terms) and
+    merged with NeighbourIndex.append, so the existing movies are neither re-read nor
+    re-scored against each other. Run build_index.py for a full refit now and then, to
+    bring new names into the vocabulary. Raises ValueError if data_path was changed
+    other than by appending rows.
+    """
+    import pandas as pd
+    from scipy.sparse import vstack
+    started = time.perf_counter()
+    current = load_artifacts(root)
+    if current is None or not current.is_appended(data_path):
+        raise ValueError(f"{data_path} is not the source of the current artifacts in {root} with rows appended; "
+                         f"rebuild them with build_index.py")
+
+    # Parse only the appended bytes, under the file's header
+    with open(data_path, 'rb') as f:
+        header = f.readline()
+        f.seek(current.manifest['source_bytes'])
+        new_data = pd.read_csv(io.BytesIO(header + f.read()), dtype=DATA_DTYPES)
+    source_sha1 = file_sha1(data_path)
+
+    vocabulary = np.asarray(current.vocabulary)
+    matrix = current.features()
+    new_matrix, _ = count_matrix(new_data['comb'], vocabulary=vocabulary.tolist())
+    neighbours = current.neighbours.append(matrix, new_matrix, block_size)
+
+    titles = np.concatenate([np.asarray(current.titles), new_data['movie_title'].astype(str).to_numpy(dtype=str)])
+    manifest = {key: current.manifest[key] for key in ('k', 'method', 'options')}
+    manifest.update(parent=current.version, appended=len(new_data))
+    return _publish(root, data_path, source_sha1, titles, vocabulary, vstack([matrix, new_matrix]).tocsr(),
+                    neighbours, manifest, started, keep)
+
+
+def _publish(root, data_path, source_sha1, titles, vocabulary, matrix, neighbours, manifest, started, keep):
+    """Write a version directory through a staging copy, then point CURRENT at it.
+
+    Each build stages in its own directory, so concurrent builds (e.g. Gunicorn workers
+    started without --preload) never share files; naming the version, moving it into
+    place and switching CURRENT happen under the publish lock.
+    """
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=root)
+    try:
+        np.save(os.path.join(staging, TITLES_FILE), titles)
+        TitleIndex.build(titles).save(staging)
+        np.save(os.path.join(staging, VOCABULARY_FILE), vocabulary.astype(str))
+        np.save(os.path.join(staging, FEATURE_INDICES_FILE), matrix.indices.astype(np.int32))
+        np.save(os.path.join(staging, FEATURE_INDPTR_FILE), matrix.indptr.astype(np.int64))
+        neighbours.save(staging)
+        open(os.path.join(staging, READERS_FILE), 'w').close()
+
+        with locked(root, PUBLISH_LOCK_FILE):
+            version = f"{time.strftime('%Y%m%d-%H%M%S')}-{source_sha1[:8]}"
+            while os.path.exists(os.path.join(root, version)):
+                version += '-1'
+            directory = os.path.join(root, version)
+
+            manifest = {
+                'version': version,
+                'created_at': time.time(),
+                'source': os.path.abspath(data_path),
+                'source_sha1': source_sha1,
+                'source_bytes': os.path.getsize(data_path),
+                'rows': len(titles),
+                **manifest,
+                'vocabulary_size': len(vocabulary),
+                'build_seconds': time.perf_counter() - started
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            # Publish: the version directory appears complete, then CURRENT switches to it
+            os.replace(staging, directory)
+            with open(os.path.join(root, CURRENT_FILE + '.tmp'), 'w') as f:
+                f.write(version)
+            os.replace(os.path.join(root, CURRENT_FILE + '.tmp'), os.path.join(root, CURRENT_FILE))
+            prune_versions(root, keep)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+def prune_versions(root, keep=3):
+    """Delete all but the newest keep versions, never the current one nor one another process has loaded"""
+    current = current_version(root)
+    versions = sorted(name for name in os.listdir(root)
+                      if os.path.exists(os.path.join(root, name, MANIFEST_FILE)))
+    for name in versions[:-keep] if keep else []:
+        if name != current and not _in_use(os.path.join(root, name)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def _in_use(directory):
+    """True if any process holds the version's readers lock"""
+    if fcntl is None:
+        return False
+    with open(os.path.join(directory, READERS_FILE), 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(f, fcntl.LOCK_UN)
+        return False
+
+
+def current_version(root):
+    path = os.path.join(root, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def load_artifacts(root='artifacts', version=None):
+    """Memory-map the current (or given) artifact version; None if nothing has been built"""
+    version = version or current_version(root)
+    if version is None:
+        return None
+    directory = os.path.join(root, version)
+    with open(os.path.join(directory, MANIFEST_FILE), 'r') as f:
+        manifest = json.load(f)
+    return RecommenderArtifacts(directory, manifest)
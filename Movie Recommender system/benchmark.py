@@ -0,0 +1,312 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.metrics.pairwise import cosine_similarity
+from ann import InvertedIndex
+from artifacts import append_artifacts, build_artifacts, load_artifacts
+from neighbours import count_matrix, top_k_neighbours, unit_vectors
+from titles import TitleIndex
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each cold start runs in a fresh interpreter in a directory holding main_data.csv, timing
+# from interpreter start to the first recommendation
+COLD_START = {
+    'original': """
+import pandas as pd, numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+data = pd.read_csv('main_data.csv', dtype={'comb': 'string', 'movie_title': 'category'})
+similarity = cosine_similarity(CountVectorizer(binary=True, max_features=8000).fit_transform(data['comb']), dense_output=False)
+suggestions = data['movie_title'].str.capitalize().tolist()
+idx = data[data['movie_title'] == 'avatar'].index[0]
+row = similarity[idx].toarray().flatten()
+top = np.argpartition(row, -11)[-11:]
+recommended = data.iloc[top[np.argsort(row[top])][::-1][1:]]['movie_title'].tolist()
+""",
+    'app': """
+import app
+recommended = app.app.test_client().post('/similarity', data={'name': 'avatar'}).data.decode().split('---')
+""",
+}
+# Peak RSS comes from VmHWM: ru_maxrss survives exec, so it would include the benchmark process itself
+COLD_START_WRAPPER = """
+import json, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {app_dir!r})
+{code}
+seconds = time.perf_counter() - started
+peak = [line.split()[1] for line in open('/proc/self/status') if line.startswith('VmHWM')]
+print(json.dumps({{'seconds': seconds, 'max_rss_mib': int(peak[0]) / 1024 if peak else float('nan'),
+                  'recommended': len(recommended)}}))
+"""
+
+
+def full_similarity_rcmd(similarity, idx, k=10):
+    """The original rcmd: densify the row, argpartition the top k + 1 and drop the first (self)"""
+    row = similarity[idx].toarray().flatten()
+    top_indices = np.argpartition(row, -(k + 1))[-(k + 1):]
+    return top_indices[np.argsort(row[top_indices])][::-1][1:]
+
+
+def synthetic_catalogue(data, n, seed=0):
+    """The real movies followed by made-up ones that recombine their cast, directors and genres.
+
+    Each made-up movie copies a real one and swaps each field for a random other movie's
+    with probability 0.3, so the catalogue keeps the clusters (franchises, directors,
+    genres) that neighbour search relies on.
+    """
+    if n <= len(data):
+        return data
+    rng = np.random.default_rng(seed)
+    fields = ['actor_1_name', 'actor_2_name', 'actor_3_name', 'director_name', 'genres']
+    extra = n - len(data)
+    made_up = data[fields].astype(str).iloc[rng.integers(len(data), size=extra)].reset_index(drop=True)
+    for field in fields:
+        swap = rng.random(extra) < 0.3
+        made_up.loc[swap, field] = data[field].astype(str).to_numpy()[rng.integers(len(data), size=swap.sum())]
+    made_up['movie_title'] = [f'synthetic movie {i}' for i in range(extra)]
+    made_up['comb'] = made_up[fields].agg(' '.join, axis=1)
+    return pd.concat([data.astype({'movie_title': str, 'comb': str}), made_up], ignore_index=True)
+
+
+def exact_query(unit, unit_t, idx, k=10):
+    """Brute-force top k for one movie, as an on-demand (not precomputed) exact search would do it"""
+    row = (unit[idx] @ unit_t).toarray().ravel()
+    row[idx] = -np.inf
+    top = np.argpartition(row, -k)[-k:]
+    return top[np.argsort(-row[top])]
+
+
+def recall_at_k(exact_scores, approx_scores, approx_indices):
+    """Share of approximate neighbours at least as similar as the exact k-th; ties count as hits"""
+    kth = exact_scores[:, -1:] - 1e-6
+    return float(((approx_scores >= kth) & (approx_indices >= 0)).sum() / exact_scores.size)
+
+
+def bench_ann(data, args):
+    data = synthetic_catalogue(data, args.catalogue)
+    matrix, _ = count_matrix(data['comb'])
+    n = matrix.shape[0]
+    rows = np.random.default_rng(1).choice(n, min(args.samples, n), replace=False)
+
+    start = time.perf_counter()
+    _, exact_scores = top_k_neighbours(matrix, args.k, args.block_size, rows=rows)
+    exact_build = (time.perf_counter() - start) * n / len(rows)
+    unit = unit_vectors(matrix)
+    unit_t = unit.T.tocsr()
+    queries = rows[:100]
+    exact_latency = min_time(lambda: [exact_query(unit, unit_t, i, args.k) for i in queries], args.repeats) / len(queries)
+    print(f"{n:,} movies: exact top-{args.k}: build {exact_build:6.1f} s (estimated from {len(rows):,} rows), "
+          f"single query {exact_latency * 1000:6.2f} ms")
+
+    for config in args.ann:
+        full_df, max_postings = map(int, config.split(':'))
+        start = time.perf_counter()
+        index = InvertedIndex(matrix, full_df=full_df, max_postings=max_postings)
+        index_time = time.perf_counter() - start
+        approx_indices, approx_scores = index.top_k_neighbours(args.k, rows=rows)
+        latency = min_time(lambda: [index.query(unit[[i]], args.k, exclude=np.array([i])) for i in queries],
+                           args.repeats) / len(queries)
+        start = time.perf_counter()
+        index.top_k_neighbours(args.k)
+        build = index_time + time.perf_counter() - start
+        print(f"  ANN full_df {full_df:5d}, max_postings {max_postings:4d}: recall@{args.k} "
+              f"{recall_at_k(exact_scores, approx_scores, approx_indices):6.1%}   "
+              f"build {build:6.1f} s   single query {latency * 1000:6.2f} ms")
+
+
+def bench_titles(data, args):
+    titles = data['movie_title'].astype(str)
+    rng = np.random.default_rng(2)
+    queries = titles.iloc[rng.choice(len(titles), min(args.samples, len(titles)), replace=False)].tolist()
+
+    start = time.perf_counter()
+    index = TitleIndex.build(titles.to_numpy())
+    build = time.perf_counter() - start
+    for title in queries:
+        if index.find(title) != data[data['movie_title'] == title].index[0]:
+            raise SystemExit(f"TitleIndex.find disagrees with the DataFrame lookup for {title!r}")
+
+    def original_lookup(title):
+        if title not in data['movie_title'].unique():
+            return None
+        return data[data['movie_title'] == title].index[0]
+
+    original = min_time(lambda: [original_lookup(t) for t in queries[:100]], args.repeats) / 100
+    indexed = min_time(lambda: [index.find(t) for t in queries], args.repeats) / len(queries)
+    print(f"Title lookup, {len(titles):,} movies (index built in {build * 1000:.0f} ms, at artifact build time): "
+          f"unique() + mask {original * 1e6:8.1f} us   binary search {indexed * 1e6:5.2f} us")
+
+    # What autocomplete sends per keystroke: the first few characters of a title, and a typo
+    prefixes = [t[:rng.integers(2, 8)] for t in queries]
+    targets = [t for t in queries if len(t) > 4]
+    typos = [t[:i] + t[i + 1:] for t, i in zip(targets, rng.integers(1, [len(t) - 1 for t in targets]))]
+    prefix_time = min_time(lambda: [index.suggest(q) for q in prefixes], args.repeats) / len(prefixes)
+    index.fuzzy(typos[0])  # builds the trigram postings once
+    fuzzy_time = min_time(lambda: [index.fuzzy(q) for q in typos], args.repeats) / len(typos)
+    found = sum(t in index.fuzzy(q) for q, t in zip(typos, targets))
+    embedded = len(json.dumps(titles.str.capitalize().tolist()))
+    print(f"Suggest: prefix {prefix_time * 1e6:6.1f} us   fuzzy {fuzzy_time * 1e3:5.2f} ms "
+          f"(typo'd title among the matches for {found / len(typos):.0%}); "
+          f"home page no longer embeds {embedded / 1024:.0f} KiB of titles")
+
+
+def bench_append(data, args):
+    data = synthetic_catalogue(data, args.catalogue)
+    n_new = min(args.new, len(data) - args.k - 1)
+    workdir = tempfile.mkdtemp(prefix='recommender-append-')
+    try:
+        path, root = os.path.join(workdir, 'main_data.csv'), os.path.join(workdir, 'artifacts')
+        data.iloc[:-n_new].to_csv(path, index=False)
+        start = time.perf_counter()
+        build_artifacts(path, root, k=args.k, block_size=args.block_size)
+        rebuild = time.perf_counter() - start
+
+        data.iloc[-n_new:].to_csv(path, mode='a', header=False, index=False)
+        start = time.perf_counter()
+        append_artifacts(path, root, block_size=args.block_size)
+        append = time.perf_counter() - start
+        artifacts = load_artifacts(root)
+        print(f"Append {n_new:,} movies to {len(data) - n_new:,}: full build {rebuild:6.2f} s   "
+              f"append {append:6.2f} s")
+
+        # Against exact neighbours over the appended matrix, for a sample of the old movies and all new ones
+        n = len(data)
+        rows = np.concatenate([np.random.default_rng(3).choice(n - n_new, min(args.samples, n - n_new), replace=False),
+                               np.arange(n - n_new, n)])
+        exact_indices, exact_scores = top_k_neighbours(artifacts.features(), args.k, args.block_size, rows=rows)
+        indices, scores = artifacts.neighbours.indices[rows], artifacts.neighbours.scores[rows]
+        worst = float(np.abs(exact_scores - scores).max())
+        # Neighbours scoring above the k-th must match; a tie for the k-th place can go to either movie
+        differ = sum(set(exact_indices[i][exact_scores[i] > exact_scores[i, -1] + 1e-6]) !=
+                     set(indices[i][scores[i] > scores[i, -1] + 1e-6]) for i in range(len(rows)))
+        print(f"Parity over {len(rows):,} movies ({n_new:,} new): max score difference {worst:.2e}; "
+              f"{differ:,} neighbour lists differ above the k-th score")
+        if worst > 1e-5 or differ:
+            raise SystemExit("Appended neighbours differ from a rebuild over the same vocabulary")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = fn()
+        return result, time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_exact(data, args):
+    matrix, _ = count_matrix(data['comb'])
+    similarity, full_time, full_peak = peak_memory(lambda: cosine_similarity(matrix, dense_output=False))
+    (indices, scores), topk_time, topk_peak = peak_memory(
+        lambda: top_k_neighbours(matrix, args.k, args.block_size))
+    print(f"Build, {len(data):,} movies: full similarity {full_time:5.2f} s / {full_peak / 2 ** 20:6.1f} MiB   "
+          f"blocked top-{args.k} {topk_time:5.2f} s / {topk_peak / 2 ** 20:5.1f} MiB "
+          f"(stored {(indices.nbytes + scores.nbytes) / 2 ** 20:.2f} MiB)")
+
+    # Duplicate titles score 1.0 against each other, so the original can drop a twin instead of the
+    # movie itself; compare against the exact top k of each row with the movie excluded
+    rows = np.random.default_rng(0).choice(len(data), min(args.samples, len(data)), replace=False)
+    worst, untied, same_set, returned_self = 0.0, 0, 0, 0
+    for idx in rows:
+        returned_self += idx in full_similarity_rcmd(similarity, idx, args.k)
+        row = similarity[idx].toarray().flatten()
+        row[idx] = -np.inf
+        order = np.argsort(-row, kind='stable')
+        worst = max(worst, float(np.abs(row[order[:args.k]] - scores[idx]).max()))
+        # Where the k-th and (k+1)-th scores tie (to float32 precision), either movie is a correct k-th neighbour
+        if row[order[args.k - 1]] - row[order[args.k]] > 1e-6:
+            untied += 1
+            same_set += set(order[:args.k]) == set(indices[idx])
+    print(f"Parity over {len(rows):,} movies: max score difference {worst:.2e}; identical neighbour sets for "
+          f"{same_set:,} of {untied:,} movies without a tie at rank {args.k}; "
+          f"the full-matrix rcmd recommended the movie itself for {returned_self:,}")
+    if worst > 1e-5 or same_set != untied:
+        raise SystemExit("Top-K neighbours differ from the full similarity matrix")
+
+    full_lookup = min_time(lambda: [full_similarity_rcmd(similarity, i, args.k) for i in rows], args.repeats)
+    topk_lookup = min_time(lambda: [indices[i, :args.k] for i in rows], args.repeats)
+    print(f"Lookup: full similarity row {full_lookup / len(rows) * 1e6:8.1f} us   "
+          f"top-K row {topk_lookup / len(rows) * 1e6:6.2f} us")
+
+
+def min_time(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_cold_start(code, workdir, env):
+    wrapper = COLD_START_WRAPPER.format(app_dir=APP_DIR, code=code)
+    out = subprocess.run([sys.executable, '-c', wrapper], cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_cold_start(args):
+    workdir = tempfile.mkdtemp(prefix='recommender-cold-start-')
+    try:
+        shutil.copy(args.data, os.path.join(workdir, 'main_data.csv'))
+        index_dir = os.path.join(workdir, 'artifacts')
+        env = dict(os.environ, MOVIE_DATA_PATH=os.path.join(workdir, 'main_data.csv'), MOVIE_INDEX_DIR=index_dir)
+
+        scenarios = [('original: CSV + CountVectorizer + full similarity', 'original', None),
+                     ('app, no artifacts (builds them)', 'app', lambda: shutil.rmtree(index_dir, ignore_errors=True)),
+                     ('app, memory-mapped artifacts', 'app', None)]
+        for label, name, setup in scenarios:
+            runs = []
+            for _ in range(args.repeats):
+                if setup:
+                    setup()
+                runs.append(run_cold_start(COLD_START[name], workdir, env))
+            best = min(runs, key=lambda r: r['seconds'])
+            print(f"Cold start to first recommendation, {label:52s} {best['seconds']:6.2f} s   "
+                  f"max RSS {best['max_rss_mib']:6.1f} MiB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and time the recommender's neighbour search")
+    parser.add_argument('--data', default=os.path.join(APP_DIR, 'datasets', 'main_data.csv'))
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--block-size', type=int, default=512)
+    parser.add_argument('--samples', type=int, default=1000, help="Movies compared against the full matrix")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--catalogue', type=int, default=0,
+                        help="ANN and append sections: grow the catalogue to this many movies with synthetic ones (e.g. 45000)")
+    parser.add_argument('--ann', nargs='+', default=['300:25', '500:50', '1000:100', '2000:100'],
+                        help="ANN section: inverted index settings as full_df:max_postings")
+    parser.add_argument('--new', type=int, default=100, help="Append section: movies appended to the catalogue")
+    parser.add_argument('--only', choices=['exact', 'ann', 'titles', 'append', 'cold-start'], help="Run a single section")
+    args = parser.parse_args(argv)
+
+    data = pd.read_csv(args.data, dtype={'comb': 'string', 'movie_title': 'category'})
+    if args.only in (None, 'exact'):
+        bench_exact(data, args)
+    if args.only in (None, 'ann'):
+        bench_ann(data, args)
+    if args.only in (None, 'titles'):
+        bench_titles(data, args)
+    if args.only in (None, 'append'):
+        bench_append(data, args)
+    if args.only in (None, 'cold-start'):
+        bench_cold_start(args)
+
+
+if __name__ == '__main__':
+    main()
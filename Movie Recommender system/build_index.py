@@ -0,0 +1,45 @@
+import argparse
+import os
+from artifacts import append_artifacts, build_artifacts, load_artifacts
+
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a new version of the recommender artifacts and make it current")
+    parser.add_argument('--data', default=os.path.join(APP_DIR, 'datasets', 'main_data.csv'),
+                        help="Movie data the app reads (MOVIE_DATA_PATH)")
+    parser.add_argument('--output', default=os.path.join(APP_DIR, 'artifacts'),
+                        help="Artifact root the app reads (MOVIE_INDEX_DIR)")
+    parser.add_argument('--k', type=int, default=10, help="Neighbours stored per movie")
+    parser.add_argument('--block-size', type=int, default=512, help="Rows of the similarity matrix computed at a time")
+    parser.add_argument('--keep', type=int, default=3, help="Versions kept on disk, including the new one")
+    parser.add_argument('--method', choices=['exact', 'ann'], default='exact',
+                        help="ann: approximate neighbours from a pruned inverted index, for large catalogues")
+    parser.add_argument('--full-df', type=int, default=500, help="ann: terms in at most this many movies are searched fully")
+    parser.add_argument('--max-postings', type=int, default=50, help="ann: movies searched per more common term")
+    parser.add_argument('--append', action='store_true',
+                        help="Only add the rows appended to --data since the current version, keeping its vocabulary")
+    args = parser.parse_args(argv)
+
+    if args.append:
+        directory = append_artifacts(args.data, args.output, block_size=args.block_size, keep=args.keep)
+        manifest = load_artifacts(args.output).manifest
+        print(f"Built {directory} in {manifest['build_seconds']:.2f}s: appended {manifest['appended']:,} movies "
+              f"to the {manifest['rows'] - manifest['appended']:,} of {manifest['parent']}")
+        return
+
+    options = {'full_df': args.full_df, 'max_postings': args.max_postings} if args.method == 'ann' else {}
+    directory = build_artifacts(args.data, args.output, k=args.k, block_size=args.block_size, keep=args.keep,
+                                method=args.method, **options)
+    artifacts = load_artifacts(args.output)
+    manifest = artifacts.manifest
+    n, k = artifacts.neighbours.indices.shape
+    print(f"Built {directory} in {manifest['build_seconds']:.1f}s: {manifest['rows']:,} movies, "
+          f"{manifest['vocabulary_size']:,} terms, top-{k} {args.method} neighbours "
+          f"(a dense similarity matrix would be {n * n * 8 / 2 ** 20:,.0f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+import json
+import os
+import numpy as np
+
+INDICES_FILE = 'neighbour_indices.npy'
+SCORES_FILE = 'neighbour_scores.npy'
+META_FILE = 'neighbours.json'
+
+
+def count_matrix(comb, vocabulary=None):
+    """Binary bag-of-words features, as the app has always built them; returns (matrix, vocabulary terms)"""
+    # scikit-learn is only needed to build, so serving from saved artifacts never imports it
+    from sklearn.feature_extraction.text import CountVectorizer
+    cv = CountVectorizer(binary=True, max_features=8000, vocabulary=vocabulary)
+    matrix = cv.fit_transform(comb)
+    return matrix, cv.get_feature_names_out()
+
+
+def unit_vectors(matrix):
+    """float32 CSR copy of a sparse matrix with L2-normalised rows, so dot products are cosines"""
+    from sklearn.preprocessing import normalize
+    return normalize(matrix.astype(np.float32), norm='l2', axis=1).tocsr()
+
+
+def _top_k(sims, k):
+    """(indices, scores) of the k largest entries of each row of a dense block, ties by column"""
+    top = np.argpartition(sims, -k, axis=1)[:, -k:]
+    top_scores = np.take_along_axis(sims, top, axis=1)
+    order = np.lexsort((top, -top_scores), axis=1)
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def top_k_neighbours(matrix, k=10, block_size=512, rows=None):
+    """(indices, scores) of the k most cosine-similar other rows of a sparse matrix, most similar first.
+
+    Rows are L2-normalised once, then similarities are computed block_size rows at a
+    time, so memory is O(block_size x N) instead of the O(N^2) of a full similarity
+    matrix. A row is never its own neighbour; ties are ordered by row number. With
+    ``rows``, only those rows' neighbours (among all rows) are computed.
+    """
+    unit = unit_vectors(matrix)
+    unit_t = unit.T.tocsr()
+    n = unit.shape[0]
+    k = min(k, n - 1)
+    rows = np.arange(n) if rows is None else np.asarray(rows)
+
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    for start in range(0, len(rows), block_size):
+        stop = min(start + block_size, len(rows))
+        sims = (unit[rows[start:stop]] @ unit_t).toarray()
+        sims[np.arange(stop - start), rows[start:stop]] = -np.inf
+        indices[start:stop], scores[start:stop] = _top_k(sims, k)
+    return indices, scores
+
+
+def append_neighbours(matrix, indices, scores, new_matrix, block_size=512):
+    """Neighbour lists after appending the rows of new_matrix to matrix; returns (indices, scores).
+
+    Only the new rows' similarities to all rows are computed, block_size new rows at a
+    time, so the cost is O(new x N) instead of the O(N^2) of a rebuild. They give the
+    new rows' own top k, and every existing row whose k-th score a new row beats gets
+    that row merged into its list. Exact lists end up with the same scores as rebuilding
+    them over the combined matrix; only which movie takes a tied k-th place can differ.
+    """
+    from scipy.sparse import vstack
+    n, m, k = matrix.shape[0], new_matrix.shape[0], indices.shape[1]
+    unit = unit_vectors(vstack([matrix, new_matrix]))
+    unit_t = unit.T.tocsr()
+
+    new_indices = np.empty((m, k), dtype=np.int32)
+    new_scores = np.empty((m, k), dtype=np.float32)
+    rows, candidates, candidate_scores = [], [], []
+    for start in range(0, m, block_size):
+        stop = min(start + block_size, m)
+        block = (unit[n + start:n + stop] @ unit_t).tocoo()
+        sims = block.toarray()
+        sims[np.arange(stop - start), np.arange(n + start, n + stop)] = -np.inf
+        new_indices[start:stop], new_scores[start:stop] = _top_k(sims, k)
+
+        # Similarity is symmetric, so the block's existing columns score the new rows for the existing ones
+        existing = block.col < n
+        rows.append(block.col[existing])
+        candidates.append(block.row[existing] + n + start)
+        candidate_scores.append(block.data[existing])
+
+    indices, scores = np.array(indices), np.array(scores)
+    rows, candidates, candidate_scores = np.concatenate(rows), np.concatenate(candidates), np.concatenate(candidate_scores)
+    # Rows padded with -1 (approximate lists) take any similar new row
+    kth = np.where(indices[:, -1] >= 0, scores[:, -1], -np.inf)
+    beats = candidate_scores > kth[rows]
+    rows, candidates, candidate_scores = rows[beats], candidates[beats], candidate_scores[beats]
+
+    # Merge each affected row's current list with its new candidates and keep the best k
+    affected = np.unique(rows)
+    merged_rows = np.concatenate([np.repeat(affected, k), rows])
+    merged = np.concatenate([indices[affected].ravel(), candidates])
+    merged_scores = np.concatenate([scores[affected].ravel(), candidate_scores])
+    sort_scores = np.where(merged >= 0, merged_scores, -np.inf)
+    order = np.lexsort((np.where(merged >= 0, merged, np.iinfo(np.int32).max), -sort_scores, merged_rows))
+    merged_rows, merged, merged_scores = merged_rows[order], merged[order], merged_scores[order]
+    rank = np.arange(len(merged_rows)) - np.searchsorted(merged_rows, merged_rows, side='left')
+    keep = rank < k
+    indices[merged_rows[keep], rank[keep]] = merged[keep]
+    scores[merged_rows[keep], rank[keep]] = merged_scores[keep]
+
+    return np.concatenate([indices, new_indices]), np.concatenate([scores, new_scores])
+
+
+class NeighbourIndex:
+    """Top-K neighbours of every movie, stored as (N, K) int32 indices and float32 cosine scores.
+
+    Part of the recommender artifacts (see artifacts.py) and loaded with memory mapping,
+    so a recommendation is a read of one K-length row rather than a pass over an N x N matrix.
+    Built exactly, or approximately with ``method='ann'`` (see ann.py), in which case a row
+    may have fewer than K neighbours, padded with -1.
+    """
+
+    def __init__(self, indices, scores, meta):
+        self.indices = indices
+        self.scores = scores
+        self.meta = meta
+
+    @classmethod
+    def build(cls, matrix, k=10, block_size=512, method='exact', **options):
+        """Neighbours of every row of a count matrix; options go to ann.InvertedIndex for method='ann'"""
+        if method == 'exact':
+            indices, scores = top_k_neighbours(matrix, k, block_size)
+        elif method == 'ann':
+            from ann import InvertedIndex
+            indices, scores = InvertedIndex(matrix, **options).top_k_neighbours(k, block_size)
+        else:
+            raise ValueError(f"Unknown neighbour search method {method}")
+        meta = {'rows': int(indices.shape[0]), 'k': int(indices.shape[1]), 'method': method, 'options': options}
+        return cls(indices, scores, meta)
+
+    def append(self, matrix, new_matrix, block_size=512):
+        """A new index with the rows of new_matrix appended to the count matrix this one was built from"""
+        indices, scores = append_neighbours(matrix, self.indices, self.scores, new_matrix, block_size)
+        meta = dict(self.meta, rows=int(indices.shape[0]), appended=self.meta.get('appended', 0) + new_matrix.shape[0])
+        return NeighbourIndex(indices, scores, meta)
+
+    @classmethod
+    def load(cls, directory):
+        """Memory-map a saved index; None if there is none"""
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return cls(np.load(os.path.join(directory, INDICES_FILE), mmap_mode='r'),
+                   np.load(os.path.join(directory, SCORES_FILE), mmap_mode='r'), meta)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so a running app never maps a half-written file
+        for name, array in [(INDICES_FILE, self.indices), (SCORES_FILE, self.scores)]:
+            path = os.path.join(directory, name)
+            np.save(path + '.tmp.npy', array)
+            os.replace(path + '.tmp.npy', path)
+        meta_path = os.path.join(directory, META_FILE)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def neighbours(self, idx, n=None):
+        """Row numbers and scores of the n (default K) most similar movies to row idx"""
+        indices, scores = self.indices[idx, :n], self.scores[idx, :n]
+        found = indices >= 0
+        return indices[found], scores[found]
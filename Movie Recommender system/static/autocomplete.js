@@ -1,11 +1,16 @@
 new autoComplete({
     data: {                              // Data src [Array, Function, Async] | (REQUIRED)
-      src: films,
+      src: async () => {                 // Matches come from the server as the user types
+        const query = document.querySelector("#autoComplete").value;
+        const response = await fetch(suggestUrl + "?q=" + encodeURIComponent(query));
+        return await response.json();
+      },
+      cache: false
     },
     selector: "#autoComplete",           // Input field selector              | (Optional)
     threshold: 2,                        // Min. Chars length to start Engine | (Optional)
     debounce: 100,                       // Post duration for engine to start | (Optional)
-    searchEngine: "strict",              // Search Engine type/mode           | (Optional)
+    searchEngine: (query, record) => record, // Already matched and ranked by /suggest | (Optional)
     resultsList: {                       // Rendered results list object      | (Optional)
         render: true,
         container: source => {
@@ -16,7 +21,6 @@ new autoComplete({
         element: "ul"
     },
     maxResults: 5,                         // Max. number of rendered results | (Optional)
-    highlight: true,                       // Highlight matching results      | (Optional)
     resultItem: {                          // Rendered result item            | (Optional)
         content: (data, source) => {
             source.innerHTML = data.match;
@@ -0,0 +1,110 @@
+import difflib
+import os
+import re
+import numpy as np
+
+SORTED_TITLES_FILE = 'sorted_titles.npy'
+TITLE_ORDER_FILE = 'title_order.npy'
+SUFFIXES_FILE = 'title_suffixes.npy'
+SUFFIX_ROWS_FILE = 'title_suffix_rows.npy'
+FUZZY_CANDIDATES = 50
+FUZZY_CUTOFF = 0.6
+
+
+def _trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """Exact, prefix and fuzzy lookup of movie titles for the recommender and the /suggest endpoint.
+
+    Part of the recommender artifacts: the titles sorted with the row of each, and the
+    sorted suffixes of each title that start at a later word with their rows, so a
+    version is memory-mapped at startup rather than sorted in every worker. Exact titles
+    and title prefixes are binary searches over the sorted titles, then word prefixes
+    over the suffixes, so "knight" also finds "the dark knight". When nothing matches
+    (a typo), the titles sharing the most character trigrams with the query are ranked
+    by difflib similarity.
+    """
+
+    def __init__(self, titles, sorted_titles, title_order, suffixes, suffix_rows):
+        self.titles = titles
+        self.sorted_titles = sorted_titles
+        self.title_order = title_order
+        self.suffixes = suffixes
+        self.suffix_rows = suffix_rows
+        self._unique = None
+        self._trigrams = None  # built by the first fuzzy lookup, which most sessions never need
+
+    @classmethod
+    def build(cls, titles):
+        """Index an array of titles (one per movie row)"""
+        titles = np.asarray(titles, dtype=str)
+        order = np.argsort(titles, kind='stable')  # duplicate titles keep row order, so find returns the first
+        suffixes = sorted((title[match.start():], row) for row, title in enumerate(titles.tolist())
+                          for match in re.finditer(r'\b\w', title) if match.start() > 0)
+        return cls(titles, titles[order], order.astype(np.int32),
+                   np.array([suffix for suffix, _ in suffixes] or [''], dtype=titles.dtype),
+                   np.array([row for _, row in suffixes] or [0], dtype=np.int32))
+
+    @classmethod
+    def load(cls, directory, titles):
+        """Memory-map a saved index for these titles; versions saved without one are indexed in memory"""
+        paths = [os.path.join(directory, name)
+                 for name in (SORTED_TITLES_FILE, TITLE_ORDER_FILE, SUFFIXES_FILE, SUFFIX_ROWS_FILE)]
+        if not all(os.path.exists(path) for path in paths):
+            return cls.build(titles)
+        return cls(titles, *(np.load(path, mmap_mode='r') for path in paths))
+
+    def save(self, directory):
+        for name, array in [(SORTED_TITLES_FILE, self.sorted_titles), (TITLE_ORDER_FILE, self.title_order),
+                            (SUFFIXES_FILE, self.suffixes), (SUFFIX_ROWS_FILE, self.suffix_rows)]:
+            np.save(os.path.join(directory, name), array)
+
+    def find(self, title):
+        """Row of the first movie with exactly this title, or None"""
+        position = int(np.searchsorted(self.sorted_titles, title))
+        if position < len(self.sorted_titles) and self.sorted_titles[position] == title:
+            return int(self.title_order[position])
+        return None
+
+    @staticmethod
+    def _prefix_range(array, prefix):
+        return (int(np.searchsorted(array, prefix, side='left')),
+                int(np.searchsorted(array, prefix + '\U0010ffff', side='left')))
+
+    def suggest(self, query, n=5):
+        """Up to n titles matching a partial title: title prefixes first, then word prefixes, else fuzzy matches"""
+        query = ' '.join(query.lower().split())
+        if not query or n <= 0:
+            return []
+
+        matches, seen = [], set()
+        for array, rows in [(self.sorted_titles, None), (self.suffixes, self.suffix_rows)]:
+            lo, hi = self._prefix_range(array, query)
+            for position in range(lo, hi):
+                title = str(array[position] if rows is None else self.titles[rows[position]])
+                if title not in seen:  # duplicate titles, or several words of one title matching
+                    seen.add(title)
+                    matches.append(title)
+                    if len(matches) == n:
+                        return matches
+        return matches or self.fuzzy(query, n)
+
+    def fuzzy(self, query, n=5, cutoff=FUZZY_CUTOFF):
+        """Up to n titles closest to query by difflib ratio, among those sharing the most trigrams with it"""
+        if self._trigrams is None:
+            self._unique = np.unique(self.sorted_titles)
+            postings = {}
+            for i, title in enumerate(self._unique.tolist()):
+                for trigram in _trigrams(title):
+                    postings.setdefault(trigram, []).append(i)
+            self._trigrams = {trigram: np.array(rows, dtype=np.int32) for trigram, rows in postings.items()}
+        hits = [self._trigrams[trigram] for trigram in _trigrams(query) if trigram in self._trigrams]
+        if not hits:
+            return []
+        counts = np.bincount(np.concatenate(hits), minlength=len(self._unique))
+        top = np.argpartition(-counts, min(FUZZY_CANDIDATES, len(counts)) - 1)[:FUZZY_CANDIDATES]
+        candidates = self._unique[top[counts[top] > 0]].tolist()
+        return difflib.get_close_matches(query, candidates, n, cutoff)
@@ -1,19 +1,32 @@
+import os
+import sys
 from keras.models import load_model
 import joblib
-from tensorflow.keras.preprocessing.sequence import pad_sequences
 import gradio as gr
+from sentiment import FastTokenizer, format_result, predict_reviews
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.batching import MicroBatcher
+
+# Concurrent requests are collected into one forward pass of up to MAX_BATCH_SIZE reviews,
+# waiting at most BATCH_WAIT_MS for the batch to fill
+MAX_BATCH_SIZE = int(os.environ.get('SENTIMENT_MAX_BATCH_SIZE', 64))
+BATCH_WAIT_MS = float(os.environ.get('SENTIMENT_BATCH_WAIT_MS', 10))
+QUEUE_SIZE = int(os.environ.get('SENTIMENT_QUEUE_SIZE', 1000))
 
 # Load model and tokenizer
 model = load_model("model.h5")
-tokenizer = joblib.load("tokenizer.pkl")
+tokenizer = FastTokenizer.from_keras(joblib.load("tokenizer.pkl"))
+
+def predictive_system_batch(reviews):
+    """Results for a list of reviews in one forward pass"""
+    return [format_result(p) for p in predict_reviews(model, tokenizer, reviews, batch_size=MAX_BATCH_SIZE)]
+
+inference = MicroBatcher(predictive_system_batch, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=BATCH_WAIT_MS).start()
 
 def predictive_system(review):
-    sequences = tokenizer.texts_to_sequences([review])
-    padded_sequence = pad_sequences(sequences, maxlen=200)
-    prediction = model.predict(padded_sequence)
-    sentiment = "Positive" if prediction[0][0] > 0.5 else "Negative"
-    confidence = float(prediction[0][0]) if sentiment == "Positive" else 1 - float(prediction[0][0])
-    return f"Sentiment: {sentiment} (Confidence: {confidence:.2%})"
+    return inference.submit(review)
 
 title = "MOVIE REVIEW SENTIMENT ANALYSIS"
 description = "Enter a movie review to analyze its sentiment (Positive/Negative)"
@@ -28,7 +41,10 @@ app = gr.Interface(
         ["This movie was fantastic! The acting was superb."],
         ["Terrible film with bad acting and weak plot."],
         ["It was okay, not great but not awful either."]
-    ]
+    ],
+    # Enough requests run at once to fill a batch; the rest wait in Gradio's queue
+    concurrency_limit=MAX_BATCH_SIZE
 )
 
-app.launch()
\ No newline at end of file
+app.queue(max_size=QUEUE_SIZE)
+app.launch(max_threads=max(40, MAX_BATCH_SIZE))
\ No newline at end of file
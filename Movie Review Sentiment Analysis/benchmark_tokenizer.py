@@ -0,0 +1,102 @@
+import argparse
+import os
+import random
+import time
+import warnings
+
+# Quiet TensorFlow start-up logging before it is imported
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+warnings.filterwarnings("ignore")
+
+import joblib
+import numpy as np
+import pandas as pd
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+from sentiment import MAX_LEN, FastTokenizer
+
+# Inputs where splitting and lookup rules matter: separators, case, markup, apostrophes, non-ASCII, empty text
+EDGE_CASES = [
+    "",
+    "   ",
+    "!!!...???",
+    "This movie was fantastic! The acting was superb.",
+    "Terrible film with bad acting and weak plot.",
+    "It was okay, not great but not awful either.",
+    "I didn't like it.<br /><br />The plot... well, there ISN'T one.",
+    "tabs\tand\nnewlines\r\nand  double  spaces",
+    "CAPITALS and MiXeD cAsE Words",
+    "ÉLAN naïve café — “quoted” ‘text’ 10/10 5-stars",
+    "unknownwordxyz qwertyuiop asdfghjkl",
+    # Long reviews whose tail has too few known words, so FastTokenizer has to widen its window
+    "good film " * 150 + "zzzunknown " * 3000,
+    "the " * 500 + "x" * 20000,
+    "ΑΣ.Σ ΟΔΟΣ " * 400,
+]
+
+
+def keras_encode(tokenizer, texts, maxlen=MAX_LEN):
+    """The original path: texts_to_sequences then pad_sequences"""
+    return pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=maxlen)
+
+
+def synthetic_reviews(tokenizer, n, min_words, max_words, seed=0):
+    """Reviews drawn from the whole vocabulary (including words beyond num_words) with punctuation and casing"""
+    rng = random.Random(seed)
+    words = list(tokenizer.word_index)
+    extras = ['<br />', ',', '.', '!', '...', "don't", 'Movie', 'FILM', 'zzzunknown', '(great)', '10/10', '\t']
+    reviews = []
+    for _ in range(n):
+        tokens = [rng.choice(extras) if rng.random() < 0.15 else words[min(int(rng.paretovariate(0.6)), len(words)) - 1]
+                  for _ in range(rng.randint(min_words, max_words))]
+        reviews.append(' '.join(tokens))
+    return reviews
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check FastTokenizer against the Keras tokenizer and time both")
+    parser.add_argument('--tokenizer', default='tokenizer.pkl')
+    parser.add_argument('--input', help="Optional CSV with a review column (e.g. the IMDB dataset) to check and time as well")
+    parser.add_argument('--reviews', type=int, default=2000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    keras_tokenizer = joblib.load(args.tokenizer)
+    fast = FastTokenizer.from_keras(keras_tokenizer)
+
+    datasets = [
+        ('edge cases', EDGE_CASES),
+        ('short reviews (10-80 words)', synthetic_reviews(keras_tokenizer, args.reviews, 10, 80, seed=1)),
+        ('long reviews (500-2500 words)', synthetic_reviews(keras_tokenizer, args.reviews, 500, 2500, seed=2)),
+    ]
+    if args.input:
+        datasets.append((os.path.basename(args.input), pd.read_csv(args.input)['review'].astype(str).tolist()))
+
+    for name, texts in datasets:
+        expected = keras_encode(keras_tokenizer, texts)
+        buffer = np.zeros((len(texts), MAX_LEN), dtype=np.int32)
+        encoded = fast.encode(texts, out=buffer)
+        if encoded.dtype != expected.dtype or not np.array_equal(encoded, expected):
+            mismatched = np.flatnonzero((encoded != expected).any(axis=1))
+            raise SystemExit(f"FastTokenizer differs from Keras on {len(mismatched)} of {len(texts)} {name}, "
+                             f"first: {texts[mismatched[0]][:200]!r}")
+        if len(texts) < 100:
+            print(f"Parity: {name} identical to texts_to_sequences + pad_sequences")
+            continue
+
+        keras_time = timed(lambda: keras_encode(keras_tokenizer, texts), args.repeats)
+        fast_time = timed(lambda: fast.encode(texts, out=buffer), args.repeats)
+        print(f"{name}: identical ids; Keras {len(texts) / keras_time:9,.0f} reviews/s   "
+              f"FastTokenizer {len(texts) / fast_time:9,.0f} reviews/s   ({keras_time / fast_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
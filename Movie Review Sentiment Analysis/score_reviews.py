@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+
+# Quiet TensorFlow start-up logging before it is imported
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+warnings.filterwarnings("ignore")
+
+import joblib
+import pandas as pd
+from keras.models import load_model
+from sentiment import FastTokenizer, label, predict_reviews
+
+
+def read_reviews(path, column, chunksize):
+    """Yield DataFrame chunks with a review column from a CSV, or from a text file with one review per line"""
+    if path.endswith('.csv'):
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield chunk.rename(columns={column: 'review'})
+    else:
+        with open(path, encoding='utf-8') as f:
+            lines = []
+            for line in f:
+                if line.strip():
+                    lines.append(line.rstrip('\n'))
+                if len(lines) == chunksize:
+                    yield pd.DataFrame({'review': lines})
+                    lines = []
+            if lines:
+                yield pd.DataFrame({'review': lines})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a file of movie reviews with the sentiment model")
+    parser.add_argument('input', help="CSV with a review column (e.g. the IMDB dataset) or a text file with one review per line")
+    parser.add_argument('output', help="Where to write the scored CSV")
+    parser.add_argument('--column', default='review', help="Review column of a CSV input")
+    parser.add_argument('--batch-size', type=int, default=256, help="Reviews per forward pass")
+    parser.add_argument('--chunksize', type=int, default=10_000, help="Reviews read and written at a time")
+    parser.add_argument('--model', default='model.h5')
+    parser.add_argument('--tokenizer', default='tokenizer.pkl')
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    tokenizer = FastTokenizer.from_keras(joblib.load(args.tokenizer))
+
+    rows, correct, labelled, started = 0, 0, 0, time.perf_counter()
+    for i, chunk in enumerate(read_reviews(args.input, args.column, args.chunksize)):
+        probabilities = predict_reviews(model, tokenizer, chunk['review'].astype(str), batch_size=args.batch_size)
+        labels = [label(p) for p in probabilities]
+        chunk['probability'] = probabilities
+        chunk['predicted_sentiment'] = [s.lower() for s, _ in labels]
+        chunk['confidence'] = [c for _, c in labels]
+        chunk.to_csv(args.output, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+        # The IMDB dataset carries positive/negative labels; report accuracy when they are present
+        if 'sentiment' in chunk:
+            known = chunk['sentiment'].isin(['positive', 'negative'])
+            correct += int((chunk.loc[known, 'sentiment'] == chunk.loc[known, 'predicted_sentiment']).sum())
+            labelled += int(known.sum())
+
+        rows += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"\r{rows:,} reviews scored  ({rows / elapsed:,.0f} reviews/s)", end='', file=sys.stderr, flush=True)
+
+    print(file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    print(f"Scored {rows:,} reviews in {elapsed:.1f}s ({rows / elapsed if elapsed else 0.0:,.0f} reviews/s, "
+          f"batch size {args.batch_size})")
+    if labelled:
+        print(f"Accuracy on {labelled:,} labelled reviews: {correct / labelled:.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+from itertools import repeat
+import numpy as np
+
+MAX_LEN = 200
+
+
+class FastTokenizer:
+    """Keras ``texts_to_sequences`` + ``pad_sequences(maxlen)`` in one pass into a preallocated int32 batch.
+
+    Built from a fitted Keras Tokenizer. The vocabulary is frozen to the ids that tokenizer
+    can emit (those below num_words), the filter characters are mapped to the split
+    character with one ``str.translate``, and word lookups run through ``map``/``filter``
+    over ``dict.get`` instead of a per-word Python loop. Each row keeps the last maxlen ids,
+    left-padded with zeros, as pad_sequences does by default, so only the tail of a long
+    review is tokenized: about 8 characters per kept id, growing until maxlen ids are found.
+    """
+
+    def __init__(self, word_index, num_words=None, filters='!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n',
+                 lower=True, split=' ', oov_token=None):
+        self.vocabulary = {w: i for w, i in word_index.items() if not num_words or i < num_words}
+        self.lower = lower
+        self.split = split
+        self.oov_index = word_index.get(oov_token) if oov_token is not None else None
+        self._table = str.maketrans({c: split for c in filters})
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        if tokenizer.char_level or tokenizer.analyzer is not None:
+            raise ValueError("Only word-level Keras tokenizers without a custom analyzer are supported")
+        return cls(tokenizer.word_index, tokenizer.num_words, tokenizer.filters,
+                   tokenizer.lower, tokenizer.split, tokenizer.oov_token)
+
+    def encode(self, texts, maxlen=MAX_LEN, out=None):
+        """(len(texts), maxlen) int32 token ids; written into ``out`` when given"""
+        texts = list(texts)
+        if out is None:
+            out = np.zeros((len(texts), maxlen), dtype=np.int32)
+        else:
+            out = out[:len(texts)]
+            out[:] = 0
+
+        get, oov = self.vocabulary.get, repeat(self.oov_index)
+        # Tail slicing relies on splitting being local to one separator character
+        tail = maxlen * 8 if len(self.split) == 1 else float('inf')
+        for row, text in enumerate(texts):
+            if self.lower:
+                text = text.lower()  # before slicing, as lowering can depend on neighbouring characters
+            size = tail
+            while True:
+                start = max(len(text) - size, 0)
+                words = text[start:].translate(self._table).split(self.split)
+                if start:
+                    words = words[1:]  # the first word may be cut off by the slice
+                # Empty strings between separators are dropped before lookup; unknown words map to None (no OOV token) and are dropped after
+                ids = list(filter(None, map(get, filter(None, words), oov)))
+                if len(ids) >= maxlen or not start:
+                    break
+                size *= 4
+            if ids:
+                ids = ids[-maxlen:]
+                out[row, maxlen - len(ids):] = ids
+        return out
+
+
+def predict_reviews(model, tokenizer, reviews, batch_size=256):
+    """Positive-sentiment probability for each review in a list, one forward pass per batch_size reviews"""
+    reviews = list(reviews)
+    probabilities = np.empty(len(reviews), dtype=np.float32)
+    buffer = np.zeros((min(batch_size, len(reviews)), MAX_LEN), dtype=np.int32)
+    for start in range(0, len(reviews), batch_size):
+        padded = tokenizer.encode(reviews[start:start + batch_size], MAX_LEN, out=buffer)
+        # predict_on_batch skips Keras' predict loop, which dominates the cost of small batches
+        probabilities[start:start + len(padded)] = np.asarray(model.predict_on_batch(padded))[:, 0]
+    return probabilities
+
+
+def label(probability):
+    """(sentiment, confidence) for a positive-sentiment probability"""
+    sentiment = "Positive" if probability > 0.5 else "Negative"
+    confidence = float(probability) if sentiment == "Positive" else 1 - float(probability)
+    return sentiment, confidence
+
+
+def format_result(probability):
+    sentiment, confidence = label(probability)
+    return f"Sentiment: {sentiment} (Confidence: {confidence:.2%})"
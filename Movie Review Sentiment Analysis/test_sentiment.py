@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pytest
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+pytest.importorskip('tensorflow')
+
+import joblib
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+from tensorflow.keras.preprocessing.text import Tokenizer
+from sentiment import MAX_LEN, FastTokenizer
+
+TOKENIZER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tokenizer.pkl')
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "!!!...???",
+    "good",
+    "This movie was fantastic! The acting was superb.",
+    "I didn't like it.<br /><br />The plot... well, there ISN'T one.",
+    "tabs\tand\nnewlines\r\nand  double  spaces",
+    "ÉLAN naïve café — “quoted” ‘text’ 10/10 5-stars",
+    # Out of vocabulary, and in the vocabulary but beyond num_words
+    "unknownwordxyz qwertyuiop asdfghjkl",
+    "zzzunknown good zzzunknown bad zzzunknown",
+    # Exactly maxlen words, one more, and far more; long tails of unknown words widen FastTokenizer's window
+    " ".join(["film"] * MAX_LEN),
+    " ".join(["film"] * MAX_LEN + ["great"]),
+    "good film " * 150 + "zzzunknown " * 3000,
+    "the " * 500 + "x" * 20000,
+]
+
+
+def keras_encode(tokenizer, texts, maxlen=MAX_LEN):
+    return pad_sequences(tokenizer.texts_to_sequences(texts), maxlen=maxlen)
+
+
+@pytest.fixture(scope='module')
+def keras_tokenizer():
+    return joblib.load(TOKENIZER_PATH)
+
+
+def test_matches_keras_on_edge_cases(keras_tokenizer):
+    rare = [w for w, i in keras_tokenizer.word_index.items() if i >= keras_tokenizer.num_words][:50]
+    texts = EDGE_CASES + [" ".join(rare), " ".join(rare + ["good"])]
+    np.testing.assert_array_equal(FastTokenizer.from_keras(keras_tokenizer).encode(texts),
+                                  keras_encode(keras_tokenizer, texts))
+
+
+@pytest.mark.parametrize('maxlen', [1, 5, 50])
+def test_matches_keras_shorter_and_longer_than_maxlen(keras_tokenizer, maxlen):
+    texts = ["good", "bad movie", "one two three four five six seven eight nine ten", EDGE_CASES[-2]]
+    np.testing.assert_array_equal(FastTokenizer.from_keras(keras_tokenizer).encode(texts, maxlen),
+                                  keras_encode(keras_tokenizer, texts, maxlen))
+
+
+def test_matches_keras_with_oov_token():
+    tokenizer = Tokenizer(num_words=6, oov_token='<OOV>')
+    tokenizer.fit_on_texts(["good good good film film bad plot acting", "great acting, bad plot!"])
+    texts = ["", "good unseen film", "great acting and a terrible plot", "unseen " * 20]
+    np.testing.assert_array_equal(FastTokenizer.from_keras(tokenizer).encode(texts, 8),
+                                  keras_encode(tokenizer, texts, 8))
+
+
+def test_encode_into_reused_buffer(keras_tokenizer):
+    fast = FastTokenizer.from_keras(keras_tokenizer)
+    out = np.full((4, MAX_LEN), 7, dtype=np.int32)
+    encoded = fast.encode(["", "good film"], out=out)
+    assert encoded.shape == (2, MAX_LEN)
+    assert np.shares_memory(encoded, out)
+    np.testing.assert_array_equal(encoded, keras_encode(keras_tokenizer, ["", "good film"]))
+    assert fast.encode([]).shape == (0, MAX_LEN)
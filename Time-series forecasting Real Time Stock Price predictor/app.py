@@ -1,13 +1,29 @@
+import time
+
+# Cold-start clock: everything below, including TensorFlow, counts towards startup time
+_started_at = time.perf_counter()
+
+import asyncio
 import os
+import sys
+import threading
 import numpy as np
 import pandas as pd
-import yfinance as yf
 import datetime as dt
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
+from charts import IndicatorCache, downsample, encode_series
+from forecasting import forecast_many, get_forecaster, predict_windows, sliding_windows
+from market_data import MarketDataCache, create_source
+from model_runtime import load_model
+from prediction_store import PredictionStore
+
+# common/ at the repository root holds code shared by the apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from common.batching import MicroBatcher
+
 import warnings
 
 # Suppress warnings
@@ -16,33 +32,40 @@ warnings.filterwarnings("ignore")
 app = Flask(__name__)
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
-# Load pre-trained model
-model = load_model('stock_price_model.h5')
-model.build((None, 60, 1))  # Explicitly build with expected input shape
+# Windows fed to the model per call; bounds memory for long (e.g. minute-bar) histories
+PREDICT_CHUNK_SIZE = int(os.environ.get('STOCK_PREDICT_CHUNK_SIZE', 4096))
+
+# STOCK_ASYNC=1 serves '/' from an async view that overlaps I/O, batched inference and chart rendering
+ASYNC_SERVING = os.environ.get('STOCK_ASYNC', '0') == '1'
+INFERENCE_BATCH_SIZE = int(os.environ.get('STOCK_INFERENCE_BATCH_SIZE', 64))
+INFERENCE_BATCH_WAIT_MS = float(os.environ.get('STOCK_INFERENCE_BATCH_WAIT_MS', 2.0))
 
+# Charts draw at most this many points per series (LTTB decimation); 0 draws every bar
+CHART_POINTS = int(os.environ.get('STOCK_CHART_POINTS', 1000))
+indicator_cache = IndicatorCache()
+# Figures load plotly.js from the CDN instead of inlining ~4 MB of it per chart; STOCK_PLOTLY_JS=inline for offline use
+PLOTLY_JS = True if os.environ.get('STOCK_PLOTLY_JS', 'cdn') == 'inline' else 'cdn'
 
-def preprocess_data(df):
-    """Process yfinance data to match training format"""
-    # Flatten multi-index columns
-    df.columns = [col[0] for col in df.columns]
+# Price history is cached on disk per symbol; only missing date ranges are fetched from the source
+market_data = MarketDataCache(os.environ.get('STOCK_CACHE_DIR', 'market_data'),
+                              create_source(os.environ.get('STOCK_DATA_SOURCE', 'yfinance')),
+                              max_age=float(os.environ.get('STOCK_CACHE_MAX_AGE', 3600)))
 
-    # Reset index and rename columns to match training
-    df = df.reset_index()
-    df = df.rename(columns={'index': 'Date'})
-    df = df[['Date', 'High', 'Low', 'Open', 'Close', 'Volume']]
+# Load pre-trained model; STOCK_MODEL_PATH may point at a TFLite export (see export_model.py)
+MODEL_PATH = os.environ.get('STOCK_MODEL_PATH', 'stock_price_model.h5')
+model, startup_timings = load_model(MODEL_PATH)
 
-    # Convert and set date index
-    df['Date'] = pd.to_datetime(df['Date'])
-    df.set_index('Date', inplace=True)
-    return df
+# In-sample predictions are stored per symbol so each request only scores windows added since the last one
+prediction_store = PredictionStore(os.environ.get('STOCK_PREDICTION_DIR', 'predictions'), model,
+                                   model_id=f"{MODEL_PATH}:{os.path.getmtime(MODEL_PATH):.0f}",
+                                   chunk_size=PREDICT_CHUNK_SIZE)
 
 
 def get_stock_data(stock_symbol, years=5):
     """Fetch and preprocess stock data"""
     end_date = dt.datetime.now()
     start_date = end_date - dt.timedelta(days=365 * years)
-    df = yf.download(stock_symbol, start=start_date, end=end_date)
-    return preprocess_data(df)
+    return market_data.get(stock_symbol, start_date, end_date)
 
 
 def prepare_data(df, time_step=60):
@@ -50,105 +73,172 @@ def prepare_data(df, time_step=60):
     scaler = MinMaxScaler(feature_range=(0, 1))
     scaled_data = scaler.fit_transform(df['Close'].values.reshape(-1, 1))
 
-    # Create dataset for LSTM
-    X, y = [], []
-    for i in range(len(scaled_data) - time_step - 1):
-        X.append(scaled_data[i:(i + time_step), 0])
-        y.append(scaled_data[i + time_step, 0])
-
-    X = np.array(X)
-    y = np.array(y)
-
-    # Reshape input to be [samples, time steps, features]
-    X = X.reshape(X.shape[0], X.shape[1], 1)
+    # Create dataset for LSTM as a strided view [samples, time steps, features];
+    # windows are only copied chunk by chunk when the model is run
+    n_samples = max(len(scaled_data) - time_step - 1, 0)
+    X = sliding_windows(scaled_data[:, 0], time_step, n_samples)
+    y = scaled_data[time_step:time_step + n_samples, 0]
 
     return X, y, scaler
 
 
 def predict_future(model, data, scaler, time_step=60, future_days=30):
     """Generate future predictions"""
-    last_data = data[-time_step:]
-    last_data = last_data.reshape(1, time_step, 1)
-
-    future_predictions = []
-    for _ in range(future_days):
-        # Ensure input shape matches training shape
-        next_pred = model.predict(last_data)
-        future_predictions.append(next_pred[0, 0])
-        last_data = np.append(last_data[:, 1:, :], [[[next_pred[0, 0]]]], axis=1)
-
-    future_predictions = np.array(future_predictions).reshape(-1, 1)
-    return scaler.inverse_transform(future_predictions)
+    # One compiled model call per day, rolling the window through a preallocated buffer
+    future_predictions = get_forecaster(model, time_step).forecast(data[-time_step:, 0], future_days)
+    return scaler.inverse_transform(future_predictions.reshape(-1, 1))
+
+
+def predict_window_batches(batches):
+    """Run the model once over window arrays queued by concurrent requests and split the results back"""
+    predictions = predict_windows(model, np.concatenate(batches), chunk_size=PREDICT_CHUNK_SIZE)
+    return np.split(predictions, np.cumsum([len(b) for b in batches])[:-1])
+
+
+# Dedicated inference thread; each forecast step and backtest update from any request joins the next batch
+inference = MicroBatcher(predict_window_batches, max_batch_size=INFERENCE_BATCH_SIZE,
+                         max_wait_ms=INFERENCE_BATCH_WAIT_MS)
+_warmed_up = threading.Event()
+
+
+def warm_up():
+    """Trace the compiled model call once so the first request does not pay for it"""
+    if not _warmed_up.is_set():
+        start = time.perf_counter()
+        get_forecaster(model).predict(np.zeros((1, 60, 1), dtype=np.float32))
+        startup_timings['first_inference_seconds'] = time.perf_counter() - start
+        _warmed_up.set()
+
+
+def start_up():
+    """Warm up before accepting traffic unless STOCK_WARMUP=0, in which case the first request overlaps it with fetching"""
+    if os.environ.get('STOCK_WARMUP', '1') == '1':
+        warm_up()
+    startup_timings['startup_seconds'] = time.perf_counter() - _started_at
+    print(f"Model {MODEL_PATH} ready in {startup_timings['startup_seconds']:.2f}s "
+          f"(import {startup_timings['import_seconds']:.2f}s, load {startup_timings['load_seconds']:.2f}s, "
+          f"first inference {startup_timings.get('first_inference_seconds', 0.0):.2f}s)")
+
+
+def forecast_dates(df, future_days):
+    return pd.date_range(start=df.index[-1], periods=future_days + 1)[1:]
+
+
+def plot_prediction(df, y_pred, stock_symbol):
+    fig_main = go.Figure()
+    x, y = downsample(df.index, df['Close'], CHART_POINTS)
+    fig_main.add_trace(go.Scatter(x=x, y=y,
+                                  name='Actual Price', line=dict(color='blue')))
+    x, y = downsample(df.index[61:], y_pred[:, 0], CHART_POINTS)
+    fig_main.add_trace(go.Scatter(x=x, y=y,
+                                  name='Predicted Price', line=dict(color='orange')))
+    fig_main.update_layout(title=f'{stock_symbol} Stock Price Prediction',
+                           template='plotly_dark')
+    return fig_main.to_html(full_html=False, include_plotlyjs=PLOTLY_JS)
+
+
+def plot_forecast(df, future_prices, stock_symbol, future_days):
+    fig_future = go.Figure()
+    x, y = downsample(df.index, df['Close'], CHART_POINTS)
+    fig_future.add_trace(go.Scatter(x=x, y=y,
+                                    name='Historical Price', line=dict(color='blue')))
+    fig_future.add_trace(go.Scatter(x=forecast_dates(df, future_days), y=future_prices[:, 0],
+                                    name='Future Prediction', line=dict(color='green')))
+    fig_future.update_layout(title=f'{stock_symbol} {future_days}-Day Forecast',
+                             template='plotly_dark')
+    return fig_future.to_html(full_html=False, include_plotlyjs=PLOTLY_JS)
+
+
+def plot_indicators(df, stock_symbol):
+    # Technical indicators, computed once per version of the symbol's history
+    indicators = indicator_cache.get(stock_symbol, df)
+
+    fig_tech = go.Figure()
+    for values, name, color in [(df['Close'], 'Price', 'blue'),
+                                (indicators['SMA_50'], '50-Day SMA', 'orange'),
+                                (indicators['SMA_200'], '200-Day SMA', 'red')]:
+        x, y = downsample(df.index, values, CHART_POINTS)
+        fig_tech.add_trace(go.Scatter(x=x, y=y, name=name, line=dict(color=color)))
+    fig_tech.update_layout(title=f'{stock_symbol} Technical Indicators',
+                           template='plotly_dark')
+    return fig_tech.to_html(full_html=False, include_plotlyjs=PLOTLY_JS)
+
+
+def render_result(df, stock_symbol, future_days, plot_main, plot_future, plot_tech):
+    return render_template('index.html',
+                           plot_main=plot_main,
+                           plot_future=plot_future,
+                           plot_tech=plot_tech,
+                           stock_symbol=stock_symbol,
+                           future_days=future_days,
+                           last_price=df['Close'].iloc[-1],
+                           last_date=df.index[-1].strftime('%Y-%m-%d'))
 
 
-@app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         stock_symbol = request.form.get('stock_symbol', 'TSLA').upper()
         future_days = int(request.form.get('future_days', 30))
 
         try:
-            # Get and prepare data
+            # Get data
             df = get_stock_data(stock_symbol)
-            X, y, scaler = prepare_data(df)
 
-            # Verify input shape
-            print(f"Input shape to model: {X.shape}")  # Should be (n_samples, 60, 1)
-
-            # Make predictions
-            y_pred = model.predict(X)
-            y_pred = scaler.inverse_transform(y_pred)
-            y_actual = scaler.inverse_transform(y.reshape(-1, 1))
+            # Make predictions, reusing stored ones for windows seen on earlier requests
+            y_pred, scaler, n_scored = prediction_store.backtest(stock_symbol, df['Close'])
+            print(f"Scored {n_scored} of {len(y_pred)} windows for {stock_symbol}")
 
             # Future prediction
             future_prices = predict_future(model,
                                            scaler.transform(df['Close'].values.reshape(-1, 1)),
                                            scaler,
                                            future_days=future_days)
-            future_dates = pd.date_range(start=df.index[-1], periods=future_days + 1)[1:]
 
             # Create plots
-            fig_main = go.Figure()
-            fig_main.add_trace(go.Scatter(x=df.index, y=df['Close'],
-                                          name='Actual Price', line=dict(color='blue')))
-            fig_main.add_trace(go.Scatter(x=df.index[61:], y=y_pred[:, 0],
-                                          name='Predicted Price', line=dict(color='orange')))
-            fig_main.update_layout(title=f'{stock_symbol} Stock Price Prediction',
-                                   template='plotly_dark')
-            plot_main = fig_main.to_html(full_html=False)
-
-            fig_future = go.Figure()
-            fig_future.add_trace(go.Scatter(x=df.index, y=df['Close'],
-                                            name='Historical Price', line=dict(color='blue')))
-            fig_future.add_trace(go.Scatter(x=future_dates, y=future_prices[:, 0],
-                                            name='Future Prediction', line=dict(color='green')))
-            fig_future.update_layout(title=f'{stock_symbol} {future_days}-Day Forecast',
-                                     template='plotly_dark')
-            plot_future = fig_future.to_html(full_html=False)
-
-            # Technical indicators
-            df['SMA_50'] = df['Close'].rolling(50).mean()
-            df['SMA_200'] = df['Close'].rolling(200).mean()
-
-            fig_tech = go.Figure()
-            fig_tech.add_trace(go.Scatter(x=df.index, y=df['Close'],
-                                          name='Price', line=dict(color='blue')))
-            fig_tech.add_trace(go.Scatter(x=df.index, y=df['SMA_50'],
-                                          name='50-Day SMA', line=dict(color='orange')))
-            fig_tech.add_trace(go.Scatter(x=df.index, y=df['SMA_200'],
-                                          name='200-Day SMA', line=dict(color='red')))
-            fig_tech.update_layout(title=f'{stock_symbol} Technical Indicators',
-                                   template='plotly_dark')
-            plot_tech = fig_tech.to_html(full_html=False)
-
-            return render_template('index.html',
-                                   plot_main=plot_main,
-                                   plot_future=plot_future,
-                                   plot_tech=plot_tech,
-                                   stock_symbol=stock_symbol,
-                                   future_days=future_days,
-                                   last_price=df['Close'].iloc[-1],
-                                   last_date=df.index[-1].strftime('%Y-%m-%d'))
+            return render_result(df, stock_symbol, future_days,
+                                 plot_prediction(df, y_pred, stock_symbol),
+                                 plot_forecast(df, future_prices, stock_symbol, future_days),
+                                 plot_indicators(df, stock_symbol))
+
+        except Exception as e:
+            return render_template('index.html', error=str(e))
+
+    return render_template('index.html')
+
+
+async def index_async():
+    """Same page as index, but fetching overlaps warm-up, inference is batched across requests and charts render concurrently.
+
+    Flask runs an async view to completion in an event loop on the thread serving the
+    request, so under a sync WSGI server (the dev server, gunicorn sync or gthread
+    workers) each request still holds a worker thread for its whole duration. The gain
+    is the overlap within a request and the shared inference batches across threads;
+    serving more concurrent requests than threads depends on how the app is deployed.
+    """
+    if request.method == 'POST':
+        stock_symbol = request.form.get('stock_symbol', 'TSLA').upper()
+        future_days = int(request.form.get('future_days', 30))
+
+        try:
+            df, _ = await asyncio.gather(asyncio.to_thread(get_stock_data, stock_symbol),
+                                         asyncio.to_thread(warm_up))
+
+            y_pred, scaler, n_scored = await asyncio.to_thread(prediction_store.backtest, stock_symbol,
+                                                               df['Close'], inference.submit)
+            print(f"Scored {n_scored} of {len(y_pred)} windows for {stock_symbol}")
+
+            # Each forecast step is queued to the inference thread alongside other requests' steps
+            scaled = scaler.transform(df['Close'].values.reshape(-1, 1))
+            forecast = await asyncio.to_thread(get_forecaster(model).forecast, scaled[-60:, 0],
+                                               future_days, inference.submit)
+            future_prices = scaler.inverse_transform(forecast.reshape(-1, 1))
+
+            plots = await asyncio.gather(
+                asyncio.to_thread(plot_prediction, df, y_pred, stock_symbol),
+                asyncio.to_thread(plot_forecast, df, future_prices, stock_symbol, future_days),
+                asyncio.to_thread(plot_indicators, df, stock_symbol)
+            )
+            return render_result(df, stock_symbol, future_days, *plots)
 
         except Exception as e:
             return render_template('index.html', error=str(e))
@@ -156,5 +246,91 @@ def index():
     return render_template('index.html')
 
 
+app.add_url_rule('/', 'index', index_async if ASYNC_SERVING else index, methods=['GET', 'POST'])
+
+
+@app.route('/api/forecast')
+def forecast_api():
+    """Forecast several tickers in one batched pass, e.g. /api/forecast?symbols=TSLA,AAPL&days=30"""
+    symbols = [s.strip().upper() for s in request.args.get('symbols', 'TSLA').split(',') if s.strip()]
+    future_days = int(request.args.get('days', 30))
+
+    try:
+        series, scalers, last_dates = {}, {}, {}
+        for symbol in symbols:
+            df = get_stock_data(symbol)
+            series[symbol] = df['Close'].values
+            scalers[symbol] = MinMaxScaler(feature_range=(0, 1)).fit(series[symbol].reshape(-1, 1))
+            last_dates[symbol] = df.index[-1]
+
+        forecasts = forecast_many(model, series, scalers, future_days=future_days)
+        return jsonify({
+            symbol: {
+                'dates': [d.strftime('%Y-%m-%d') for d in pd.date_range(start=last_dates[symbol], periods=future_days + 1)[1:]],
+                'prices': prices.tolist()
+            }
+            for symbol, prices in forecasts.items()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/api/chart_data')
+def chart_data():
+    """Downsampled series behind the three charts, e.g. /api/chart_data?symbol=TSLA&days=30&points=800&encoding=base64"""
+    stock_symbol = request.args.get('symbol', 'TSLA').upper()
+    future_days = int(request.args.get('days', 30))
+    points = int(request.args.get('points', CHART_POINTS))
+    encoding = request.args.get('encoding', 'json')
+    if encoding not in ('json', 'base64'):
+        return jsonify({'error': "encoding must be 'json' or 'base64'"}), 400
+
+    try:
+        df = get_stock_data(stock_symbol)
+        y_pred, scaler, _ = prediction_store.backtest(stock_symbol, df['Close'])
+        future_prices = predict_future(model,
+                                       scaler.transform(df['Close'].values.reshape(-1, 1)),
+                                       scaler,
+                                       future_days=future_days)
+        indicators = indicator_cache.get(stock_symbol, df)
+
+        series = {
+            'close': (df.index, df['Close'].to_numpy()),
+            'predicted': (df.index[61:], y_pred[:, 0]),
+            'forecast': (forecast_dates(df, future_days), future_prices[:, 0]),
+            'sma_50': (df.index, indicators['SMA_50']),
+            'sma_200': (df.index, indicators['SMA_200'])
+        }
+        return jsonify({
+            'symbol': stock_symbol,
+            'last_price': float(df['Close'].iloc[-1]),
+            'last_date': df.index[-1].strftime('%Y-%m-%d'),
+            'points': points,
+            'encoding': encoding,
+            'series': {name: encode_series(*downsample(index, values, points), encoding)
+                       for name, (index, values) in series.items()}
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/api/cache_stats')
+def cache_stats():
+    return jsonify({'market_data': market_data.stats(), 'predictions': prediction_store.stats(),
+                    'indicators': indicator_cache.stats()})
+
+
+@app.route('/api/startup')
+def startup():
+    return jsonify(startup_timings)
+
+
+@app.route('/api/batching_stats')
+def batching_stats():
+    return jsonify(dict(inference.stats(), async_serving=ASYNC_SERVING))
+
+
+start_up()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+import numpy as np
+
+# Quiet TensorFlow start-up logging before it is imported
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+warnings.filterwarnings("ignore")
+
+from forecasting import Forecaster, predict_windows, sliding_windows
+from model_runtime import load_model
+
+TIME_STEP = 60
+
+# Run in a fresh interpreter per measurement, so nothing is imported or traced beforehand
+COLD_START = '''
+import json, os, sys, time
+started = time.perf_counter()
+import numpy as np
+from forecasting import get_forecaster
+from model_runtime import load_model
+model, timings = load_model(sys.argv[1])
+start = time.perf_counter()
+get_forecaster(model).predict(np.zeros((1, 60, 1), dtype=np.float32))
+timings['first_inference_seconds'] = time.perf_counter() - start
+start = time.perf_counter()
+get_forecaster(model).predict(np.zeros((1, 60, 1), dtype=np.float32))
+timings['warm_inference_seconds'] = time.perf_counter() - start
+timings['startup_seconds'] = time.perf_counter() - started
+timings['tensorflow_imported'] = 'tensorflow' in sys.modules
+print(json.dumps(timings))
+'''
+
+
+def random_walks(n_series, length, seed=0):
+    """Synthetic scaled price histories in [0, 1], standing in for downloaded tickers"""
+    rng = np.random.default_rng(seed)
+    walks = np.cumsum(rng.normal(scale=0.01, size=(n_series, length)), axis=1)
+    walks -= walks.min(axis=1, keepdims=True)
+    return walks / walks.max(axis=1, keepdims=True)
+
+
+def sequential_forecast(model, data, time_step=TIME_STEP, future_days=30):
+    """The original predict_future loop: one model.predict and one np.append per day"""
+    last_data = data[-time_step:].reshape(1, time_step, 1)
+    future_predictions = []
+    for _ in range(future_days):
+        next_pred = model.predict(last_data, verbose=0)
+        future_predictions.append(next_pred[0, 0])
+        last_data = np.append(last_data[:, 1:, :], [[[next_pred[0, 0]]]], axis=1)
+    return np.array(future_predictions)
+
+
+def loop_windows(scaled_data, time_step=TIME_STEP):
+    """The original prepare_data loop: a list of 60-element slices turned into one array"""
+    X = []
+    for i in range(len(scaled_data) - time_step - 1):
+        X.append(scaled_data[i:(i + time_step), 0])
+    X = np.array(X)
+    return X.reshape(X.shape[0], X.shape[1], 1)
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def timed(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_forecast(model, args):
+    series = random_walks(args.tickers, 500)
+    forecaster = Forecaster(model, TIME_STEP)
+    forecaster.forecast(series[:1], 1)  # trace the step function once
+
+    expected = np.stack([sequential_forecast(model, s, future_days=args.days) for s in series])
+    batched = forecaster.forecast(series, args.days)
+    error = np.abs(batched - expected).max()
+    print(f"Parity: max |batched - sequential| = {error:.2e} over {args.tickers} tickers x {args.days} days")
+    if error > 1e-4:
+        raise SystemExit("Forecasts differ from the sequential model.predict loop")
+
+    one_seq = timed(lambda: sequential_forecast(model, series[0], future_days=args.days), args.repeats)
+    one_fast = timed(lambda: forecaster.forecast(series[:1], args.days), args.repeats)
+    many_fast = timed(lambda: forecaster.forecast(series, args.days), args.repeats)
+    print(f"{args.days}-day forecast, 1 ticker:   sequential predict {one_seq * 1000:8.1f} ms   "
+          f"compiled step {one_fast * 1000:7.1f} ms   ({one_seq / one_fast:.0f}x)")
+    print(f"{args.days}-day forecast, {args.tickers} tickers: sequential predict {one_seq * args.tickers * 1000:8.1f} ms   "
+          f"batched step  {many_fast * 1000:7.1f} ms   ({one_seq * args.tickers / many_fast:.0f}x)")
+
+
+def bench_prepare(model, args):
+    for label, length in [('5y daily', 5 * 252), ('minute bars', args.minute_bars)]:
+        scaled_data = random_walks(1, length)[0].reshape(-1, 1)
+        n_samples = length - TIME_STEP - 1
+
+        looped, loop_peak = peak_memory(lambda: loop_windows(scaled_data))
+        strided, view_peak = peak_memory(lambda: sliding_windows(scaled_data[:, 0], TIME_STEP, n_samples))
+        if not np.array_equal(looped, strided):
+            raise SystemExit(f"Strided windows differ from the loop for {label}")
+
+        loop_time = timed(lambda: loop_windows(scaled_data), args.repeats)
+        view_time = timed(lambda: sliding_windows(scaled_data[:, 0], TIME_STEP, n_samples), args.repeats)
+        print(f"Windows, {label} ({n_samples:,} x {TIME_STEP}): loop {loop_time * 1000:8.2f} ms / {loop_peak / 2 ** 20:7.1f} MiB   "
+              f"strided view {view_time * 1000:6.3f} ms / {view_peak / 2 ** 20:5.2f} MiB")
+
+    windows = sliding_windows(random_walks(1, args.minute_bars)[0], TIME_STEP)
+    expected = model.predict(np.ascontiguousarray(windows, dtype=np.float32), batch_size=args.chunk_size, verbose=0)
+    chunked, chunk_peak = peak_memory(lambda: predict_windows(model, windows, chunk_size=args.chunk_size))
+    error = np.abs(chunked - expected).max()
+    print(f"Chunked predict over {len(windows):,} windows: max |chunked - predict| = {error:.2e}, "
+          f"peak {chunk_peak / 2 ** 20:.1f} MiB vs {windows.size * 4 / 2 ** 20:.1f} MiB for the full float32 array")
+    if error > 1e-4:
+        raise SystemExit("Chunked predictions differ from model.predict")
+
+
+def bench_cold_start(args):
+    paths = [args.model] + [p for p in [os.path.splitext(args.model)[0] + '.tflite'] if os.path.exists(p)]
+    for path in paths:
+        runs = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, '-c', COLD_START, path], capture_output=True, text=True,
+                                 check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            timings = json.loads(out.stdout.strip().splitlines()[-1])
+            timings['process_seconds'] = time.perf_counter() - start
+            runs.append(timings)
+        best = min(runs, key=lambda t: t['process_seconds'])
+        print(f"Cold start, {os.path.basename(path):22s}: process {best['process_seconds']:5.2f} s   "
+              f"import {best['import_seconds']:5.2f} s   load {best['load_seconds']:5.2f} s   "
+              f"first inference {best['first_inference_seconds'] * 1000:7.1f} ms   "
+              f"warm inference {best['warm_inference_seconds'] * 1000:5.1f} ms   "
+              f"tensorflow imported: {best['tensorflow_imported']}")
+    if len(paths) == 1:
+        print("No TFLite export next to the model; run export_model.py to compare")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check parity and time the stock model's inference paths")
+    parser.add_argument('--model', default='stock_price_model.h5')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--tickers', type=int, default=16)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--minute-bars', type=int, default=100_000, help="Length of the long intraday series")
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--only', choices=['forecast', 'prepare', 'cold-start'], help="Run a single section")
+    args = parser.parse_args(argv)
+
+    if args.only in (None, 'cold-start'):
+        bench_cold_start(args)
+    if args.only == 'cold-start':
+        return
+
+    model, _ = load_model(args.model)
+    if args.only in (None, 'prepare'):
+        bench_prepare(model, args)
+    if args.only in (None, 'forecast'):
+        bench_forecast(model, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import base64
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps when reducing (x, y) to threshold points.
+
+    The first and last points are always kept. Every bucket in between contributes
+    the point forming the largest triangle with the previously kept point and the
+    mean of the next bucket, which preserves peaks and troughs that plain striding drops.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)  # threshold - 2 interior buckets
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(index, values, points):
+    """LTTB-decimate a date-indexed series to at most points points, skipping NaNs (e.g. SMA warm-up)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    if not points:
+        return index[valid], values[valid]
+    x = index.values[valid].astype('datetime64[ms]').astype(np.float64)
+    keep = valid[lttb(x, values[valid], points)]
+    return index[keep], values[keep]
+
+
+def encode_series(index, values, encoding='json'):
+    """Chart series payload: epoch-millisecond x values and y values, as JSON lists or base64 arrays.
+
+    With ``encoding='base64'`` x is little-endian float64 and y little-endian float32,
+    ready for ``new Float64Array`` / ``new Float32Array`` on the client.
+    """
+    x = np.asarray(index.values).astype('datetime64[ms]').astype(np.int64)
+    if encoding == 'base64':
+        return {
+            'x': base64.b64encode(x.astype('<f8').tobytes()).decode('ascii'),
+            'y': base64.b64encode(np.asarray(values, dtype='<f4').tobytes()).decode('ascii'),
+            'length': len(x)
+        }
+    return {'x': x.tolist(), 'y': np.round(np.asarray(values, dtype=np.float64), 4).tolist(), 'length': len(x)}
+
+
+class IndicatorCache:
+    """Technical indicators per symbol, computed once per version of its price history.
+
+    A version is identified by (first date, last date, number of bars, last close), so
+    a new bar or a longer history recomputes. Repeated requests and the three charts
+    of one request share the same arrays.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbol, df):
+        key = (symbol, df.index[0], df.index[-1], len(df), float(df['Close'].iloc[-1]))
+        with self._lock:
+            indicators = self._entries.get(key)
+            if indicators is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return indicators
+            self.misses += 1
+
+        close = df['Close']
+        indicators = {
+            'SMA_50': close.rolling(50).mean().to_numpy(),
+            'SMA_200': close.rolling(200).mean().to_numpy()
+        }
+        with self._lock:
+            # Older versions of this symbol's history are never asked for again
+            for stale in [k for k in self._entries if k[0] == symbol]:
+                del self._entries[stale]
+            self._entries[key] = indicators
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return indicators
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
@@ -0,0 +1,50 @@
+import argparse
+import os
+import warnings
+import numpy as np
+
+# Quiet TensorFlow start-up logging before it is imported
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+warnings.filterwarnings("ignore")
+
+from forecasting import Forecaster
+from model_runtime import TIME_STEP, export_tflite, load_model
+
+
+def check_parity(keras_model, tflite_model, n_windows=256, future_days=30, seed=0):
+    """Max absolute difference between the Keras and TFLite models on one-step and multi-step forecasts"""
+    rng = np.random.default_rng(seed)
+    walks = np.cumsum(rng.normal(scale=0.01, size=(n_windows, TIME_STEP)), axis=1)
+    walks -= walks.min(axis=1, keepdims=True)
+    windows = (walks / walks.max(axis=1, keepdims=True)).astype(np.float32)
+
+    keras, lite = Forecaster(keras_model, TIME_STEP), Forecaster(tflite_model, TIME_STEP)
+    step_error = np.abs(keras.predict(windows[:, :, np.newaxis]) - lite.predict(windows[:, :, np.newaxis])).max()
+    forecast_error = np.abs(keras.forecast(windows[:8], future_days) - lite.forecast(windows[:8], future_days)).max()
+    return step_error, forecast_error
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the stock LSTM to TFLite and check it against the Keras model")
+    parser.add_argument('--model', default='stock_price_model.h5')
+    parser.add_argument('--output', help="Defaults to the model path with a .tflite extension")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Fixed batch of the exported graph; larger inputs run in padded batches of this size")
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.model)[0] + '.tflite'
+    keras_model, _ = load_model(args.model)
+    size = export_tflite(keras_model, output, TIME_STEP, args.batch_size)
+    print(f"Wrote {output} ({size / 1024:.0f} KiB, batch size {args.batch_size}); "
+          f"{args.model} is {os.path.getsize(args.model) / 1024:.0f} KiB")
+
+    tflite_model, _ = load_model(output)
+    step_error, forecast_error = check_parity(keras_model, tflite_model)
+    print(f"Parity: max |keras - tflite| = {step_error:.2e} per step, {forecast_error:.2e} over a 30-day forecast")
+    if max(step_error, forecast_error) > args.tolerance:
+        raise SystemExit("TFLite predictions differ from the Keras model")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from model_runtime import TFLiteModel
+
+# One compiled forecaster per loaded model and window length
+_forecasters = {}
+
+
+class Forecaster:
+    """Autoregressive multi-step forecasts without per-step Keras predict overhead.
+
+    Each step calls the model once through a compiled ``tf.function`` (no predict
+    loop, callbacks or batching machinery) on every series at once. Windows and
+    predictions live in one preallocated (n_series, time_step + future_days) buffer.
+    The window for step k is the view ``buffer[:, k:k + time_step]``, so the history
+    is never copied or appended to. A TFLiteModel is already compiled and is called as is.
+    """
+
+    def __init__(self, model, time_step=60):
+        self.model = model
+        self.time_step = time_step
+        self._step = None
+        if not isinstance(model, TFLiteModel):
+            import tensorflow as tf
+            self._step = tf.function(
+                lambda windows: model(windows, training=False),
+                input_signature=[tf.TensorSpec(shape=(None, time_step, 1), dtype=tf.float32)]
+            )
+
+    def predict(self, windows):
+        """One compiled model call on a (n, time_step, 1) array; returns (n, 1) predictions"""
+        if self._step is None:
+            return self.model.predict(windows)
+        return self._step(windows).numpy()
+
+    def forecast(self, windows, future_days=30, predict=None):
+        """Forecast future_days steps for a (n_series, >= time_step) array of scaled prices.
+
+        ``predict`` replaces the compiled model call for each step, e.g. to batch steps
+        across concurrent requests. Returns a (n_series, future_days) float32 array in
+        the same scaled units.
+        """
+        predict = predict or self.predict
+        windows = np.asarray(windows, dtype=np.float32)
+        if windows.ndim == 1:
+            windows = windows.reshape(1, -1)
+        if windows.shape[1] < self.time_step:
+            raise ValueError(f"Need at least {self.time_step} prices per series, got {windows.shape[1]}")
+
+        buffer = np.empty((len(windows), self.time_step + future_days, 1), dtype=np.float32)
+        buffer[:, :self.time_step, 0] = windows[:, -self.time_step:]
+        for k in range(future_days):
+            window = buffer[:, k:k + self.time_step]
+            buffer[:, self.time_step + k] = predict(window)
+        return buffer[:, self.time_step:, 0].copy()
+
+
+def sliding_windows(values, time_step=60, n_windows=None):
+    """(n_windows, time_step, 1) read-only view of consecutive windows over a 1-D series.
+
+    No data is copied: window i shares memory with values[i:i + time_step].
+    """
+    windows = sliding_window_view(np.asarray(values).reshape(-1), time_step)
+    if n_windows is not None:
+        windows = windows[:n_windows]
+    return windows[:, :, np.newaxis]
+
+
+def predict_windows(model, windows, chunk_size=4096, time_step=60):
+    """Run the model over (n, time_step, 1) windows, materializing at most chunk_size of them at once"""
+    forecaster = get_forecaster(model, time_step)
+    predictions = np.empty((len(windows), 1), dtype=np.float32)
+    for start in range(0, len(windows), chunk_size):
+        chunk = np.ascontiguousarray(windows[start:start + chunk_size], dtype=np.float32)
+        predictions[start:start + len(chunk)] = forecaster.predict(chunk)
+    return predictions
+
+
+def get_forecaster(model, time_step=60):
+    """Reuse the compiled step function across requests for the same model"""
+    key = (id(model), time_step)
+    forecaster = _forecasters.get(key)
+    if forecaster is None or forecaster.model is not model:
+        forecaster = _forecasters[key] = Forecaster(model, time_step)
+    return forecaster
+
+
+def forecast_many(model, series, scalers, time_step=60, future_days=30):
+    """Forecast several tickers in one batched pass.
+
+    ``series`` and ``scalers`` map ticker -> closing prices and the MinMaxScaler fitted
+    on them. Returns ticker -> (future_days,) array of prices in original units.
+    """
+    tickers = list(series)
+    windows = np.stack([
+        scalers[t].transform(np.asarray(series[t], dtype=np.float64)[-time_step:].reshape(-1, 1))[:, 0]
+        for t in tickers
+    ])
+    scaled = get_forecaster(model, time_step).forecast(windows, future_days)
+    return {t: scalers[t].inverse_transform(scaled[i].reshape(-1, 1))[:, 0] for i, t in enumerate(tickers)}
@@ -0,0 +1,50 @@
+import argparse
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+def user(url, body, deadline, latencies, errors):
+    """One simulated user submitting the form back to back until the deadline"""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, data=body, timeout=300) as response:
+                response.read()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-user load test for the stock predictor page")
+    parser.add_argument('--url', default='http://127.0.0.1:5000/')
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds per concurrency level")
+    parser.add_argument('--symbols', nargs='+', default=['TSLA'], help="Users cycle through these symbols")
+    parser.add_argument('--future-days', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    print(f"{'users':>5}  {'requests':>8}  {'req/s':>7}  {'p50 ms':>8}  {'p99 ms':>8}  {'errors':>6}")
+    for n_users in args.users:
+        latencies, errors = [], []
+        deadline = time.perf_counter() + args.duration
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_users) as pool:
+            for i in range(n_users):
+                body = urllib.parse.urlencode({'stock_symbol': args.symbols[i % len(args.symbols)],
+                                               'future_days': args.future_days}).encode()
+                pool.submit(user, args.url, body, deadline, latencies, errors)
+        elapsed = time.perf_counter() - start
+
+        timings = np.array(latencies) * 1000 if latencies else np.zeros(1)
+        print(f"{n_users:>5}  {len(latencies):>8}  {len(latencies) / elapsed:>7.2f}  "
+              f"{np.percentile(timings, 50):>8.0f}  {np.percentile(timings, 99):>8.0f}  {len(errors):>6}")
+        if errors:
+            print(f"       first error: {errors[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['High', 'Low', 'Open', 'Close', 'Volume']
+RECORD_DTYPE = np.dtype([('Date', 'datetime64[ns]')] + [(c, 'f8') for c in COLUMNS])
+
+
+def preprocess_data(df):
+    """Process yfinance data to match training format"""
+    # Flatten multi-index columns
+    df.columns = [col[0] for col in df.columns]
+
+    # Reset index and rename columns to match training
+    df = df.reset_index()
+    df = df.rename(columns={'index': 'Date', 'Datetime': 'Date'})
+    df = df[['Date', 'High', 'Low', 'Open', 'Close', 'Volume']]
+
+    # Convert and set date index
+    df['Date'] = pd.to_datetime(df['Date'])
+    df.set_index('Date', inplace=True)
+    return df
+
+
+def empty_frame():
+    return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=np.float64)
+
+
+class YFinanceSource:
+    """Daily bars from Yahoo Finance"""
+    name = 'yfinance'
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+        df = yf.download(symbol, start=start, end=end, progress=False)
+        return empty_frame() if df.empty else preprocess_data(df)
+
+
+class CSVSource:
+    """Bars from <directory>/<SYMBOL>.csv with Date, High, Low, Open, Close, Volume columns (fixtures, exports)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.name = f'csv:{directory}'
+
+    def fetch(self, symbol, start, end):
+        path = os.path.join(self.directory, f'{symbol}.csv')
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No data file for {symbol} in {self.directory}")
+        df = pd.read_csv(path, parse_dates=['Date'], index_col='Date')[COLUMNS]
+        return df[(df.index >= start) & (df.index < end)]
+
+
+def create_source(spec):
+    """'yfinance' or 'csv:<directory>'"""
+    if spec == 'yfinance':
+        return YFinanceSource()
+    if spec.startswith('csv:'):
+        return CSVSource(spec[len('csv:'):])
+    raise ValueError(f"Unknown market data source {spec}")
+
+
+class MarketDataCache:
+    """On-disk cache of price history per symbol, stored as memory-mapped NumPy records.
+
+    Each symbol has ``<SYMBOL>.npy`` (records sorted by date) and ``<SYMBOL>.json``
+    (the date range already fetched). A request only goes to the source for the parts
+    of [start, end) that are not covered yet. The newest cached bar is always
+    re-fetched once the data is older than ``max_age`` seconds, because that bar may
+    still have been in progress when it was stored. If the source fails and some
+    data is cached, the stale data is served.
+    """
+
+    def __init__(self, directory, source, max_age=3600):
+        self.directory = directory
+        self.source = source
+        self.max_age = max_age
+        self._locks = defaultdict(threading.Lock)
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'partial_hits': 0, 'misses': 0, 'stale_served': 0, 'fetches': 0,
+                       'fetch_errors': 0, 'rows_fetched': 0, 'fetch_seconds': 0.0, 'last_fetch_seconds': None}
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, symbol):
+        name = re.sub(r'[^A-Z0-9._^=-]', '_', symbol)
+        return os.path.join(self.directory, f'{name}.npy'), os.path.join(self.directory, f'{name}.json')
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _read(self, symbol):
+        records_path, meta_path = self._paths(symbol)
+        if not (os.path.exists(records_path) and os.path.exists(meta_path)):
+            return None, None
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return np.load(records_path, mmap_mode='r'), meta
+
+    def _write(self, symbol, frame, covered_start, covered_end):
+        records_path, meta_path = self._paths(symbol)
+        records = np.empty(len(frame), dtype=RECORD_DTYPE)
+        records['Date'] = frame.index.values
+        for column in COLUMNS:
+            records[column] = frame[column].to_numpy(dtype=np.float64)
+
+        # Write then rename so readers never see a half-written file
+        np.save(records_path + '.tmp.npy', records)
+        os.replace(records_path + '.tmp.npy', records_path)
+        meta = {
+            'symbol': symbol,
+            'source': getattr(self.source, 'name', type(self.source).__name__),
+            'covered_start': covered_start.isoformat(),
+            'covered_end': covered_end.isoformat(),
+            'rows': len(records),
+            'updated_at': time.time()
+        }
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _fetch(self, symbol, start, end):
+        began = time.perf_counter()
+        try:
+            frame = self.source.fetch(symbol, start, end)
+        except Exception:
+            self._count(fetch_errors=1)
+            raise
+        elapsed = time.perf_counter() - began
+        self._count(fetches=1, rows_fetched=len(frame), fetch_seconds=elapsed)
+        with self._stats_lock:
+            self._stats['last_fetch_seconds'] = elapsed
+
+        frame = frame[COLUMNS].astype(np.float64)
+        if getattr(frame.index, 'tz', None) is not None:
+            frame.index = frame.index.tz_localize(None)
+        return frame
+
+    def get(self, symbol, start, end):
+        """Return a DataFrame of [start, end) bars indexed by Date, fetching only what is missing"""
+        symbol = symbol.upper()
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+        with self._locks[symbol]:
+            records, meta = self._read(symbol)
+            if records is None:
+                ranges = [(start, end)]
+                cached = empty_frame()
+                covered_start, covered_end = start, end
+            else:
+                cached = self._to_frame(records)
+                covered_start = pd.Timestamp(meta['covered_start'])
+                covered_end = pd.Timestamp(meta['covered_end'])
+                ranges = []
+                # Compare at day granularity so a start that moves by seconds per request is still a hit
+                if start.normalize() < covered_start.normalize():
+                    ranges.append((start, covered_start))
+                if end > covered_end and (end - covered_end).total_seconds() > self.max_age:
+                    refresh_from = cached.index[-1] if len(cached) else covered_end
+                    ranges.append((min(refresh_from, covered_end), end))
+                covered_start, covered_end = min(start, covered_start), max(end, covered_end)
+
+            if not ranges:
+                self._count(hits=1)
+            else:
+                try:
+                    fetched = [self._fetch(symbol, a, b) for a, b in ranges]
+                except Exception as e:
+                    if not len(cached):
+                        raise
+                    print(f"Serving cached {symbol} data; fetch failed: {str(e)}")
+                    self._count(stale_served=1)
+                else:
+                    if records is None:
+                        self._count(misses=1)
+                    else:
+                        self._count(partial_hits=1)
+                    # Newly fetched bars replace cached ones for the same timestamp
+                    frames = [f for f in [cached] + fetched if len(f)]
+                    merged = pd.concat(frames) if frames else empty_frame()
+                    cached = merged[~merged.index.duplicated(keep='last')].sort_index()
+                    self._write(symbol, cached, covered_start, covered_end)
+
+        cached.index.name = 'Date'
+        return cached[(cached.index >= start) & (cached.index < end)].copy()
+
+    @staticmethod
+    def _to_frame(records):
+        return pd.DataFrame({column: np.asarray(records[column]) for column in COLUMNS},
+                            index=pd.DatetimeIndex(np.asarray(records['Date']), name='Date'))
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['partial_hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['mean_fetch_seconds'] = stats['fetch_seconds'] / stats['fetches'] if stats['fetches'] else 0.0
+        stats['directory'] = self.directory
+        stats['symbols'] = sorted(f[:-len('.npy')] for f in os.listdir(self.directory)
+                                  if f.endswith('.npy') and not f.endswith('.tmp.npy'))
+        return stats
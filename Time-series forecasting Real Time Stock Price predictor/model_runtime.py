@@ -0,0 +1,88 @@
+import threading
+import time
+import numpy as np
+
+TIME_STEP = 60
+
+
+def _tflite_interpreter():
+    """The lightest TFLite interpreter installed; full TensorFlow is only imported as a last resort"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """TFLite export of the LSTM with a (n, time_step, 1) -> (n, 1) predict like the Keras path.
+
+    The exported graph has a fixed batch size (the LSTM's tensor lists do not convert
+    with a dynamic one), so inputs are run in batches of that size with the last one
+    zero-padded. The interpreter is not thread-safe and is guarded by a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.interpreter = _tflite_interpreter()(model_path=path)
+        self.interpreter.allocate_tensors()
+
+        input_details = self.interpreter.get_input_details()[0]
+        self._input = input_details['index']
+        self._output = self.interpreter.get_output_details()[0]['index']
+        self.batch_size, self.time_step = int(input_details['shape'][0]), int(input_details['shape'][1])
+        self._batch = np.zeros(tuple(input_details['shape']), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def predict(self, windows):
+        windows = np.asarray(windows, dtype=np.float32).reshape(-1, self.time_step, 1)
+        predictions = np.empty((len(windows), 1), dtype=np.float32)
+        with self._lock:
+            for start in range(0, len(windows), self.batch_size):
+                chunk = windows[start:start + self.batch_size]
+                self._batch[:len(chunk)] = chunk
+                self.interpreter.set_tensor(self._input, self._batch)
+                self.interpreter.invoke()
+                predictions[start:start + len(chunk)] = self.interpreter.get_tensor(self._output)[:len(chunk)]
+        return predictions
+
+
+def load_model(path, time_step=TIME_STEP):
+    """Load a Keras (.h5/.keras) or TFLite (.tflite) model; returns (model, timings).
+
+    TensorFlow is imported here rather than at module import, so a TFLite model
+    served through ai_edge_litert never loads it at all.
+    """
+    timings = {'model_path': path}
+    start = time.perf_counter()
+    if path.endswith('.tflite'):
+        _tflite_interpreter()
+        timings['import_seconds'] = time.perf_counter() - start
+        start = time.perf_counter()
+        model = TFLiteModel(path)
+    else:
+        from tensorflow.keras.models import load_model as load_keras_model
+        timings['import_seconds'] = time.perf_counter() - start
+        start = time.perf_counter()
+        model = load_keras_model(path)
+        model.build((None, time_step, 1))  # Explicitly build with expected input shape
+    timings['load_seconds'] = time.perf_counter() - start
+    return model, timings
+
+
+def export_tflite(model, path, time_step=TIME_STEP, batch_size=1):
+    """Convert the Keras LSTM to a fixed-batch TFLite flatbuffer at path"""
+    import tensorflow as tf
+
+    # Rebuild the layers on a fixed-shape input so the LSTM loops lower to TFLite builtins
+    fixed = tf.keras.Sequential([tf.keras.Input(batch_shape=(batch_size, time_step, 1))] +
+                                [layer.__class__.from_config(layer.get_config()) for layer in model.layers])
+    fixed.set_weights(model.get_weights())
+    flatbuffer = tf.lite.TFLiteConverter.from_keras_model(fixed).convert()
+    with open(path, 'wb') as f:
+        f.write(flatbuffer)
+    return len(flatbuffer)
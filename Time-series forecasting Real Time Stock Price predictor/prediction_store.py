@@ -0,0 +1,111 @@
+import os
+import re
+import threading
+from collections import defaultdict
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+from forecasting import predict_windows, sliding_windows
+
+
+def scaler_from_range(data_min, data_max):
+    """MinMaxScaler with exactly the parameters it would learn from data spanning [data_min, data_max]"""
+    return MinMaxScaler(feature_range=(0, 1)).fit(np.array([[data_min], [data_max]], dtype=np.float64))
+
+
+class PredictionStore:
+    """Per-symbol store of in-sample (backtest) predictions and the scaler they were made with.
+
+    Predictions are kept in scaled units, keyed by the date they predict. They stay
+    valid while the model and the scaler range are unchanged, so a later request only
+    scores windows whose target date is new. If the lowest or highest close differs
+    from the stored range (a new extreme, or an old one leaving the window), or the
+    model file changes, the scaler is refit and every window is rescored, exactly as
+    prepare_data would do.
+    """
+
+    def __init__(self, directory, model, model_id, time_step=60, chunk_size=4096):
+        self.directory = directory
+        self.model = model
+        self.model_id = model_id
+        self.time_step = time_step
+        self.chunk_size = chunk_size
+        self._locks = defaultdict(threading.Lock)
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'full_rescores': 0, 'windows_scored': 0, 'windows_reused': 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.directory, re.sub(r'[^A-Z0-9._^=-]', '_', symbol.upper()) + '.npz')
+
+    def _load(self, symbol):
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as stored:
+            if str(stored['model_id']) != self.model_id or int(stored['time_step']) != self.time_step:
+                return None
+            return {name: stored[name] for name in ('dates', 'predictions', 'data_min', 'data_max')}
+
+    def _save(self, symbol, dates, predictions, scaler):
+        path = self._path(symbol)
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, dates=dates, predictions=predictions, model_id=np.array(self.model_id),
+                     time_step=np.array(self.time_step),
+                     data_min=scaler.data_min_[0], data_max=scaler.data_max_[0])
+        os.replace(path + '.tmp', path)
+
+    def backtest(self, symbol, closes, predict=None):
+        """Predict every window of a closing-price Series; returns (prices, scaler, n_scored).
+
+        Window i covers closes[i:i + time_step] and predicts closes[i + time_step].
+        Windows are taken as in prepare_data, so ``prices`` has the same length as
+        its y and is in price units. ``predict(windows)`` replaces the chunked model
+        call for new windows.
+        """
+        values = closes.to_numpy(dtype=np.float64).reshape(-1, 1)
+        n_samples = max(len(values) - self.time_step - 1, 0)
+        target_dates = closes.index.values[self.time_step:self.time_step + n_samples].astype('datetime64[ns]')
+
+        with self._locks[symbol.upper()]:
+            stored = self._load(symbol)
+            # prepare_data fits the scaler to the current closes, so the stored one is only valid for the same range
+            if stored is not None and stored['data_min'] == values.min() and stored['data_max'] == values.max():
+                scaler = scaler_from_range(stored['data_min'], stored['data_max'])
+                positions = np.searchsorted(stored['dates'], target_dates).clip(max=max(len(stored['dates']) - 1, 0))
+                found = stored['dates'][positions] == target_dates if len(stored['dates']) else np.zeros(n_samples, dtype=bool)
+            else:
+                scaler = MinMaxScaler(feature_range=(0, 1)).fit(values)
+                positions = np.zeros(n_samples, dtype=np.int64)
+                found = np.zeros(n_samples, dtype=bool)
+                self._count(full_rescores=1)
+
+            predictions = np.empty((n_samples, 1), dtype=np.float32)
+            if found.any():
+                predictions[found] = stored['predictions'][positions[found]]
+
+            missing = np.flatnonzero(~found)
+            if len(missing):
+                windows = sliding_windows(scaler.transform(values)[:, 0], self.time_step, n_samples)
+                # Only the new windows are gathered into an array; a full rescore streams the view in chunks
+                batch = windows if len(missing) == n_samples else windows[missing]
+                if predict is None:
+                    predictions[missing] = predict_windows(self.model, batch, self.chunk_size, self.time_step)
+                else:
+                    predictions[missing] = predict(batch)
+                self._save(symbol, target_dates, predictions, scaler)
+
+        self._count(requests=1, windows_scored=len(missing), windows_reused=int(found.sum()))
+        return scaler.inverse_transform(predictions), scaler, len(missing)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        windows = stats['windows_scored'] + stats['windows_reused']
+        stats['reuse_rate'] = stats['windows_reused'] / windows if windows else 0.0
+        stats['directory'] = self.directory
+        return stats
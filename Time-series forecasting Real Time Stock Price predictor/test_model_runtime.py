@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pytest
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+tf = pytest.importorskip('tensorflow')
+
+from export_model import check_parity
+from model_runtime import TIME_STEP, TFLiteModel, export_tflite, load_model
+
+TOLERANCE = 1e-4
+
+
+@pytest.fixture(scope='module')
+def keras_model():
+    """A small LSTM shaped like the app's model (time_step x 1 -> 1), with fixed random weights"""
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(TIME_STEP, 1)),
+        tf.keras.layers.LSTM(16, return_sequences=True),
+        tf.keras.layers.LSTM(8),
+        tf.keras.layers.Dense(1)
+    ])
+    return model
+
+
+def windows(n, seed=1):
+    return np.random.default_rng(seed).random((n, TIME_STEP, 1)).astype(np.float32)
+
+
+@pytest.mark.parametrize('batch_size', [1, 4])
+def test_tflite_matches_keras(keras_model, tmp_path, batch_size):
+    path = str(tmp_path / 'model.tflite')
+    assert export_tflite(keras_model, path, TIME_STEP, batch_size) > 0
+
+    lite = TFLiteModel(path)
+    assert lite.batch_size == batch_size
+    # 10 windows also exercise the zero-padded last batch when batch_size is 4
+    x = windows(10)
+    predictions = lite.predict(x)
+    assert predictions.shape == (10, 1)
+    np.testing.assert_allclose(predictions, keras_model.predict(x, verbose=0), atol=TOLERANCE, rtol=0)
+
+
+def test_forecast_parity_through_load_model(keras_model, tmp_path):
+    path = str(tmp_path / 'model.tflite')
+    export_tflite(keras_model, path, TIME_STEP)
+    lite, timings = load_model(path)
+    assert isinstance(lite, TFLiteModel)
+    assert timings['model_path'] == path
+
+    step_error, forecast_error = check_parity(keras_model, lite, n_windows=16)
+    assert step_error <= TOLERANCE
+    assert forecast_error <= TOLERANCE
@@ -0,0 +1,186 @@
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import joblib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# <name>[_<version>].<ext>, e.g. isolation_forest_20250508_2214.pkl or columns.json
+ARTIFACT_PATTERN = re.compile(r'^(?P<name>.+?)(?:_(?P<version>\d{8}_\d{4,6}))?\.(?P<ext>pkl|pickle|joblib|json)$')
+UNVERSIONED = '0'
+
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        if resource is None:
+            return 0
+        # Peak RSS is the best portable approximation (kilobytes on Linux, bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if os.uname().sysname == 'Darwin' else rss * 1024
+
+
+def load_file(path, mmap_mode='r'):
+    """Load one artifact file.
+
+    Only NumPy arrays stored by ``joblib.dump`` (e.g. the Credit Card models) are
+    memory-mapped and so shared between processes; plain pickles, like the Backpack
+    and Home price artifacts, are read into each process's memory as before.
+    """
+    path = Path(path)
+    if path.suffix == '.json':
+        with open(path, 'r') as f:
+            return json.load(f)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+class ArtifactRegistry:
+    """Discover versioned artifact sets in a directory and atomically swap the active one.
+
+    ``names`` lists the artifact base names that make up a complete set. Files named
+    ``<name>_<YYYYMMDD_HHMM>.<ext>`` belong to that version; unversioned files form
+    version ``'0'``. ``loader`` receives ``{name: path}`` and returns the object that
+    request handlers use. Handlers should call ``get()`` once per request and keep
+    the returned bundle, so a swap never changes artifacts under an in-flight request.
+    ``on_swap(previous, version)`` runs after every load, including a reload of the
+    active version, since its files may have been replaced under the same names.
+    """
+
+    def __init__(self, directory, names, loader, on_swap=None):
+        self.directory = Path(directory)
+        self.names = list(names)
+        self.loader = loader
+        self.on_swap = on_swap
+
+        self._active = (None, None)  # (version, bundle), replaced in a single assignment
+        self._load_lock = threading.Lock()
+        self._stats = {}
+        self._watcher = None
+
+    def discover(self):
+        """Return {version: {name: path}} for every complete artifact set, oldest first"""
+        found = {}
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                match = ARTIFACT_PATTERN.match(path.name)
+                if match and match.group('name') in self.names:
+                    version = match.group('version') or UNVERSIONED
+                    found.setdefault(version, {})[match.group('name')] = path
+
+        complete = {v: paths for v, paths in found.items() if len(paths) == len(self.names)}
+        return dict(sorted(complete.items()))
+
+    def latest_version(self):
+        versions = list(self.discover())
+        return versions[-1] if versions else None
+
+    @property
+    def active_version(self):
+        return self._active[0]
+
+    def get(self):
+        """Return the active bundle"""
+        bundle = self._active[1]
+        if bundle is None:
+            raise Exception("Artifacts not loaded")
+        return bundle
+
+    def load(self, version=None):
+        """Load a version (the latest by default) and make it active; returns the version"""
+        with self._load_lock:
+            available = self.discover()
+            if not available:
+                raise FileNotFoundError(f"No complete artifact set {self.names} in {self.directory}")
+            if version is None:
+                version = list(available)[-1]
+            if version not in available:
+                raise KeyError(f"Artifact version {version} not found in {self.directory}")
+
+            paths = available[version]
+            rss_before = current_rss()
+            start = time.perf_counter()
+            bundle = self.loader(paths)
+            load_seconds = time.perf_counter() - start
+            rss_after = current_rss()
+
+            self._stats[version] = {
+                'load_seconds': round(load_seconds, 4),
+                'rss_delta_bytes': rss_after - rss_before,
+                'rss_after_bytes': rss_after,
+                'loaded_at': time.time(),
+                'files': {name: str(path) for name, path in paths.items()}
+            }
+
+            previous = self._active[0]
+            self._active = (version, bundle)
+
+        print(f"Activated artifact version {version} from {self.directory} in {load_seconds:.3f}s")
+        if self.on_swap is not None:
+            self.on_swap(previous, version)
+        return version
+
+    def refresh(self):
+        """Load the newest version if it differs from the active one; returns True on a swap"""
+        latest = self.latest_version()
+        if latest is None or latest == self.active_version:
+            return False
+        self.load(latest)
+        return True
+
+    def reload_async(self, version=None):
+        """Load in a background thread; requests keep using the current version until the swap.
+
+        Returns the thread, or None when no version is given and the latest one is
+        already active, so there is nothing to load.
+        """
+        if version is None and self.latest_version() == self.active_version:
+            return None
+
+        def run():
+            try:
+                if version is None:
+                    self.refresh()
+                else:
+                    self.load(version)
+            except Exception as e:
+                print(f"Background artifact load failed: {str(e)}")
+
+        thread = threading.Thread(target=run, name='artifact-loader', daemon=True)
+        thread.start()
+        return thread
+
+    def watch(self, interval=30.0):
+        """Poll the directory and hot-swap new versions as they appear"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Artifact refresh failed: {str(e)}")
+
+        self._watcher = threading.Thread(target=run, name='artifact-watcher', daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stats(self):
+        return {
+            'directory': str(self.directory),
+            'active_version': self.active_version,
+            'available_versions': list(self.discover()),
+            'process_rss_bytes': current_rss(),
+            'versions': {v: dict(s) for v, s in self._stats.items()}
+        }
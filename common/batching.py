@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Coalesce concurrent single predictions into vectorized batch calls.
+
+    Callers block in ``submit`` while a background worker drains the queue, flushing
+    whenever ``max_batch_size`` items are waiting or the oldest item has waited
+    ``max_wait_ms``. ``predict_batch`` receives a list of items and must return one
+    result per item, in order.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_wait_ms=5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stats = {
+            'requests': 0,
+            'requests_flushed': 0,
+            'batches': 0,
+            'max_batch_size_seen': 0,
+            'max_queue_depth_seen': 0,
+            'total_wait_s': 0.0,
+            'total_predict_s': 0.0,
+            'batch_size_histogram': {},
+        }
+
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+        return self
+
+    def submit(self, item, timeout=None):
+        """Queue one item and block until its result is ready"""
+        return self.submit_future(item).result(timeout=timeout)
+
+    def submit_future(self, item):
+        """Queue one item and return a concurrent.futures.Future for its result (awaitable via asyncio.wrap_future)"""
+        if self._worker is None:
+            self.start()
+
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats['requests'] += 1
+            if depth > self._stats['max_queue_depth_seen']:
+                self._stats['max_queue_depth_seen'] = depth
+
+        return future
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, batch_size_histogram=dict(self._stats['batch_size_histogram']))
+
+        batches = stats['batches']
+        stats['queue_depth'] = self._queue.qsize()
+        stats['max_batch_size'] = self.max_batch_size
+        stats['max_wait_ms'] = self.max_wait * 1000.0
+        stats['mean_batch_size'] = stats['requests_flushed'] / batches if batches else 0.0
+        stats['mean_wait_ms'] = stats['total_wait_s'] * 1000.0 / stats['requests_flushed'] if batches else 0.0
+        stats['mean_predict_ms'] = stats['total_predict_s'] * 1000.0 / batches if batches else 0.0
+        return stats
+
+    def _collect(self):
+        """Block for the first item, then gather more until the batch is full or the deadline passes"""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _, _ in batch]
+            flushed_at = time.perf_counter()
+
+            try:
+                results = self.predict_batch(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"predict_batch returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            predict_s = time.perf_counter() - flushed_at
+            size = len(batch)
+            with self._lock:
+                stats = self._stats
+                stats['batches'] += 1
+                stats['requests_flushed'] += size
+                stats['total_wait_s'] += sum(flushed_at - queued_at for _, _, queued_at in batch)
+                stats['total_predict_s'] += predict_s
+                stats['max_batch_size_seen'] = max(stats['max_batch_size_seen'], size)
+                histogram = stats['batch_size_histogram']
+                histogram[size] = histogram.get(size, 0) + 1